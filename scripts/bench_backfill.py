@@ -0,0 +1,85 @@
+"""Backfiller 를 로컬 가짜 Upbit candles 서버에 돌려 rows/s 측정 + 결과 검증.
+
+서버는 초당 --server_rate 요청을 넘으면 429 + Retry-After 를 돌려준다.
+python -m scripts.bench_backfill --tickers 8 --days 3 --interval minute1
+"""
+import argparse, json, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+from upbit_rl.data.store import OHLCVStore, interval_delta
+from upbit_rl.data.backfill import Backfiller, TokenBucket, KST
+
+END = pd.Timestamp("2024-06-01 00:00:00")  # 가짜 서버의 "현재" (KST)
+
+def make_handler(delta, bars, server_rate):
+    bucket = TokenBucket(server_rate)
+    stats = {"requests": 0, "429": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def do_GET(self):
+            ok = bucket.try_acquire()
+            with lock:
+                stats["requests"] += 1
+                stats["429"] += not ok
+            if not ok:
+                self.send_response(429); self.send_header("Retry-After", "0.2"); self.end_headers()
+                return
+            q = parse_qs(urlparse(self.path).query)
+            count = int(q.get("count", ["200"])[0])
+            to = pd.Timestamp(q["to"][0]) + KST if "to" in q else END + delta
+            hi = min(bars, int(np.ceil((to - (END - (bars - 1) * delta)) / delta)))  # to 이전(exclusive) 마지막 인덱스 + 1
+            rows = []
+            for k in range(hi - 1, max(hi - count, 0) - 1, -1):  # 최신 -> 과거
+                ts = END - (bars - 1 - k) * delta
+                price = 1e6 + k
+                rows.append({"market": q["market"][0], "candle_date_time_kst": ts.strftime("%Y-%m-%dT%H:%M:%S"),
+                             "opening_price": price, "high_price": price + 1, "low_price": price - 1, "trade_price": price,
+                             "candle_acc_trade_volume": 1.0, "candle_acc_trade_price": price})
+            body = json.dumps(rows).encode()
+            self.send_response(200); self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body))); self.end_headers()
+            self.wfile.write(body)
+    return Handler, stats
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=8)
+    p.add_argument("--days", type=float, default=3)
+    p.add_argument("--interval", default="minute1")
+    p.add_argument("--rate", type=float, default=50.0, help="클라이언트 초당 요청")
+    p.add_argument("--server_rate", type=float, default=40.0, help="가짜 서버 허용 초당 요청")
+    p.add_argument("--workers", type=int, default=4)
+    args = p.parse_args()
+
+    delta = interval_delta(args.interval)
+    bars = int(pd.Timedelta(days=args.days) / delta) + 1000  # since 보다 과거 데이터도 있음
+    handler, stats = make_handler(delta, bars, args.server_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    store = OHLCVStore(tempfile.mkdtemp())
+    bf = Backfiller(store, base_url=f"http://127.0.0.1:{server.server_port}", rate=args.rate, workers=args.workers, backoff=0.05)
+    tickers = [f"KRW-T{i:02d}" for i in range(args.tickers)]
+    since = END - pd.Timedelta(days=args.days)
+    t0 = time.perf_counter()
+    rows = bf.run(tickers, args.interval, since)
+    sec = time.perf_counter() - t0
+    before = stats["requests"]
+    again = bf.run(tickers, args.interval, since)  # 이미 저장된 구간은 건너뜀 -> 티커당 1 페이지
+    server.shutdown()
+
+    expect = int(pd.Timedelta(days=args.days) / delta) + 1
+    for t in tickers:
+        a = store.arrays(t, args.interval)
+        assert len(a["ts"]) == expect and (np.diff(a["ts"]) == delta.value).all(), t
+    total = sum(rows.values())
+    print(f"{args.tickers} tickers x {expect} {args.interval} bars, workers={args.workers} rate={args.rate}/s")
+    print(f"requests={stats['requests']} (429: {stats['429']})")
+    print(f"{total} rows in {sec:.2f}s -> {total / sec:,.0f} rows/s")
+    print(f"re-run: {stats['requests'] - before} requests, {sum(again.values())} rows (last bar refresh only)")
@@ -0,0 +1,91 @@
+"""backtest 검증/속도: bar 마다 Agent.act 로 재생하며 DailyOHLCVEnv 를 step (이전 방식) vs upbit_rl.backtest.
+
+- 정확도: 순차 재생 결과(실제 비중으로 매번 추론) 와 grid 보간 backtest 의 목표 비중/최종 수익 차이
+- 체결: thresh=0, min_krw=0 에서 simulate 경로 == 같은 목표로 step 한 DailyOHLCVEnv 총자산
+- 속도: 순차 재생 vs backtest (체크포인트 여러 개 x thresh 여러 개, --workers)
+
+python -m scripts.bench_backtest --years 3 --models 4 --workers 2
+"""
+import argparse, os, tempfile, time
+import numpy as np
+from scripts.bench_env import synthetic_ohlcv
+from upbit_rl.data.store import OHLCVStore
+from upbit_rl.rl.environment import DailyOHLCVEnv
+from upbit_rl.rl.networks import make_actor_beta
+from upbit_rl.rl.agent import Agent
+from upbit_rl.backtest import load_data, policy_targets, simulate, run
+
+def replay(actor, feats, close, window, thresh, fee=0.0005):
+    """이전 방식: bar 마다 (window, 4) 상태를 만들어 추론 1회 + env step. 반환: 목표 비중, 당시 비중 (N-1,), 총자산 (N,)."""
+    agent = Agent(actor, explore=False)
+    env = DailyOHLCVEnv.__new__(DailyOHLCVEnv)
+    env.feats, env.close, env.N = np.asarray(feats), np.asarray(close), len(close)
+    env.fee, env.pen, env.init_krw, env.window = fee, 0.0, 1_000_000, window
+    env.reset()
+    targets, weights, totals = [], [], [env.total]
+    for t in range(env.N - 1):
+        w = env._state()[-1]
+        x = np.zeros((1, window, 4), dtype=np.float32)
+        rows = env.feats[max(0, t - window + 1):t + 1]
+        x[0, window - len(rows):, :3] = rows
+        x[0, window - len(rows):, 3] = w
+        tw = agent.act(x)
+        targets.append(tw); weights.append(w)
+        _, _, _, info = env.step(tw if abs(tw - w) > thresh else w)
+        totals.append(info["total"])
+    return np.array(targets), np.array(weights), np.array(totals)
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--years", type=int, default=3)
+    p.add_argument("--window", type=int, default=30)
+    p.add_argument("--models", type=int, default=4)
+    p.add_argument("--thresh", default="0,0.01,0.02,0.05,0.1,0.2")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--grid", type=int, default=11)
+    args = p.parse_args()
+
+    root = tempfile.mkdtemp()
+    OHLCVStore(root).append("KRW-BTC", "day", synthetic_ohlcv(365 * args.years, seed=0))
+    feats, close = load_data(root, "KRW-BTC")
+    paths = []
+    for i in range(args.models):
+        actor = make_actor_beta(4)
+        rng = np.random.default_rng(i)
+        actor.set_weights([w + rng.normal(0, 0.2, w.shape).astype(w.dtype) for w in actor.get_weights()])  # 출력이 고르게 퍼지도록
+        paths.append(os.path.join(root, f"actor_{i}.keras"))
+        actor.save(paths[-1])
+
+    # 체결 계산: simulate == DailyOHLCVEnv.step
+    actor = __import__("tensorflow").keras.models.load_model(paths[0], compile=False)
+    grid_t = policy_targets(paths[0], feats, args.window, args.grid)
+    eq, _, _ = simulate(grid_t, close, [0.0], min_krw=0.0)
+    env = DailyOHLCVEnv.__new__(DailyOHLCVEnv)
+    env.feats, env.close, env.N = np.asarray(feats), np.asarray(close), len(close)
+    env.fee, env.pen, env.init_krw, env.window = 0.0005, 0.0, 1_000_000, args.window
+    env.reset()
+    grid = np.linspace(0, 1, grid_t.shape[1])
+    totals = [env.total]
+    for t in range(env.N - 1):
+        w = env.qty * env.close[t] / env.total  # float64 (관측의 float32 비중이 아니라)
+        totals.append(env.step(np.interp(w, grid, grid_t[t]))[3]["total"])
+    print(f"fill path  max |simulate - env| = {np.abs(eq[0] - np.array(totals)).max():.3e} KRW")
+
+    # 정확도 + 속도: 순차 재생 vs backtest
+    thresh = [float(x) for x in args.thresh.split(",")]
+    t0 = time.perf_counter()
+    ref_t, ref_w, ref_eq = replay(actor, feats, close, args.window, 0.05)
+    t_replay = time.perf_counter() - t0
+    err = np.abs(np.array([np.interp(w, grid, g) for w, g in zip(ref_w, grid_t)]) - ref_t)
+    eq5, _, _ = simulate(grid_t, close, [0.05], min_krw=0.0)
+    print(f"grid={args.grid} interp |target err| mean {err.mean():.2e} p99 {np.quantile(err, 0.99):.2e} max {err.max():.2e} (target range {ref_t.min():.2f}..{ref_t.max():.2f})")
+    print(f"return thresh=0.05: backtest {eq5[0, -1] / eq5[0, 0] - 1:+.4%} vs replay {ref_eq[-1] / ref_eq[0] - 1:+.4%}")
+
+    cfg = {"interval": "day", "window": args.window, "grid": args.grid, "batch": 2048, "fee": 0.0005, "init_krw": 1_000_000, "min_krw": 0.0}
+    for workers in sorted({0, args.workers}):
+        t0 = time.perf_counter()
+        df = run(paths, thresh, feats, close, cfg, workers)
+        sec = time.perf_counter() - t0
+        print(f"backtest {len(paths)} models x {len(thresh)} thresh, workers={workers}: {sec:.2f}s "
+              f"(replay 1 model x 1 thresh: {t_replay:.2f}s -> est. x{t_replay * len(paths) * len(thresh) / sec:.0f})")
+    print(df.sort_values("sharpe", ascending=False).head(6).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
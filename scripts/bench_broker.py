@@ -0,0 +1,127 @@
+"""리밸런스 거래소 왕복: 티커별 잔고/현재가 + 순차 주문 vs get_balances 1회 + 현재가 1회 + 동시 주문.
+
+가짜 계좌(호출마다 --rtt_ms 지연, 호출 수 집계)로 네트워크 없이 비교하고, UpbitClient.timings 요약도 출력.
+연결 재사용은 로컬 keep-alive HTTP 서버에 공개 시세 요청 (requests.get vs upbit_client.session()) 을 보내 TCP 연결 수를 센다.
+python -m scripts.bench_broker --tickers 8 --rtt_ms 40
+"""
+import argparse, socket, threading, time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from upbit_rl.broker import upbit_client
+from upbit_rl.broker.upbit_client import UpbitClient, summarize_timings
+from upbit_rl.broker.broker import Broker
+
+class FakeAccount:
+    """pyupbit.Upbit + upbit_client.get_current_price 대체. 모든 호출에 rtt 지연."""
+    def __init__(self, tickers, rtt_ms):
+        self.rtt = rtt_ms / 1e3
+        self.calls = Counter()
+        self.bal = {"KRW": 1e7, **{t.split("-")[1]: 0.5 for t in tickers}}
+        self._lock = threading.Lock()
+
+    def _hit(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        time.sleep(self.rtt)
+
+    def get_balances(self):
+        self._hit("get_balances")
+        return [{"currency": c, "balance": str(q), "unit_currency": "KRW"} for c, q in self.bal.items()]
+
+    def get_balance(self, c):
+        self._hit("get_balance")
+        return self.bal.get(c, 0.0)
+
+    def get_current_price(self, t):
+        self._hit("get_current_price")
+        return {x: 1e6 for x in t} if isinstance(t, list) else 1e6
+
+    def buy_market_order(self, t, krw):
+        self._hit("buy_market_order")
+        return {"uuid": t}
+
+    def sell_market_order(self, t, qty):
+        self._hit("sell_market_order")
+        return {"uuid": t}
+
+def legacy_rebalance(acct, tickers, orders):
+    """이전 방식: 티커마다 잔고 2회 + 현재가, 주문마다 현재가 재조회 후 순차 제출."""
+    for t in tickers:
+        acct.get_balance("KRW"); acct.get_balance(t.split("-")[1]); acct.get_current_price(t)
+    for t, side, amt in orders:
+        acct.get_current_price(t)
+        (acct.sell_market_order if side == "sell" else acct.buy_market_order)(t, amt)
+
+def batched_rebalance(broker, tickers, orders):
+    pf = broker.get_portfolio(tickers)
+    res = broker.submit_orders(orders, pf["price"])
+    assert not any(isinstance(r, Exception) for r in res), res
+
+def count_connections(n):
+    stats = {"connections": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # 헤더/본문 분할 전송의 Nagle 지연 제거
+            stats["connections"] += 1
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Remaining-Req", "group=ticker; min=600; sec=9")
+            self.send_header("Content-Length", "2"); self.end_headers()
+            self.wfile.write(b"[]")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/ticker"
+    out = {}
+    for mode, impl in (("requests.get", requests), ("shared Session", upbit_client.session())):
+        stats["connections"] = 0
+        t0 = time.perf_counter()
+        for _ in range(n):
+            impl.get(url, params={"markets": "KRW-BTC"}, timeout=5).raise_for_status()
+        out[mode] = (stats["connections"], (time.perf_counter() - t0) / n * 1e3)
+    server.shutdown()
+    return out
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=8)
+    p.add_argument("--rtt_ms", type=float, default=40.0, help="가짜 거래소 호출 지연")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--requests", type=int, default=50, help="연결 재사용 확인용 요청 수")
+    args = p.parse_args()
+
+    for mode, (conns, ms) in count_connections(args.requests).items():
+        print(f"{mode:15s}: {args.requests} requests over {conns} TCP connection(s), {ms:.2f} ms/request")
+
+    tickers = [f"KRW-T{i:02d}" for i in range(args.tickers)]
+    orders = [(t, "sell" if i % 2 else "buy", 0.01 if i % 2 else 1e5) for i, t in enumerate(tickers)]
+
+    acct = FakeAccount(tickers, args.rtt_ms)
+    t0 = time.perf_counter()
+    legacy_rebalance(acct, tickers, orders)
+    t_old, old_calls = time.perf_counter() - t0, acct.calls
+
+    acct = FakeAccount(tickers, args.rtt_ms)
+    upbit_client.get_current_price = acct.get_current_price
+    client = UpbitClient(max_age=0.0)
+    client.upbit = acct
+    broker = Broker(client)
+    broker.paper = False  # 실계좌 경로 (가짜 계좌로)
+    broker.max_workers = args.workers
+    t0 = time.perf_counter()
+    batched_rebalance(broker, tickers, orders)
+    t_new = time.perf_counter() - t0
+
+    print(f"legacy : {sum(old_calls.values()):3d} exchange calls, {t_old * 1e3:7.0f} ms  {dict(old_calls)}")
+    print(f"batched: {sum(acct.calls.values()):3d} exchange calls, {t_new * 1e3:7.0f} ms  {dict(acct.calls)}, {args.workers} order workers")
+    for name, (n, sec) in summarize_timings(client.timings).items():
+        print(f"  {name:18s} x{n:<3d} total {sec * 1e3:7.1f} ms")
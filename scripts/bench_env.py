@@ -0,0 +1,114 @@
+"""DailyOHLCVEnv step/s 측정: pandas .loc 경로(이전) vs 배열 경로(현재),
+그리고 K개 단일 env 루프 vs VectorDailyOHLCVEnv 한 번.
+
+python -m scripts.bench_env --years 8 --envs 16
+"""
+import argparse, time
+import numpy as np
+import pandas as pd
+from upbit_rl.rl.environment import DailyOHLCVEnv, VectorDailyOHLCVEnv, FEATURES
+
+def synthetic_ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 5e7 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    spread = np.abs(rng.normal(0, 0.02, n))
+    return pd.DataFrame({
+        "date": pd.date_range("2017-01-01", periods=n, freq="D"),
+        "open": close * (1 + rng.normal(0, 0.01, n)),
+        "high": close * (1 + spread),
+        "low": close * (1 - spread),
+        "close": close,
+        "volume": rng.lognormal(8, 1, n),
+    })
+
+class PandasDailyOHLCVEnv(DailyOHLCVEnv):
+    """이전 구현: 매 step df.loc 조회 + astype(float)."""
+    def reset(self):
+        self.t = 0
+        self.krw = self.init_krw
+        self.qty = 0.0
+        self.price = float(self.df.loc[self.t, "close"])
+        self._update_total()
+        return self._state()
+
+    def step(self, target_weight: float):
+        target_weight = float(np.clip(target_weight, 0.0, 1.0))
+        self.price = float(self.df.loc[self.t, "close"])
+        self._update_total()
+        curr_w = 0.0 if self.total <= 0 else (self.qty * self.price) / self.total
+        delta_w = target_weight - curr_w
+        if delta_w > 1e-9:
+            buy_krw = self.total * delta_w
+            fee = buy_krw * self.fee
+            self.krw -= buy_krw
+            self.qty += (buy_krw - fee) / self.price
+        elif delta_w < -1e-9:
+            sell_qty = min(self.qty, self.total * (-delta_w) / self.price)
+            proceeds = sell_qty * self.price
+            self.krw += proceeds - proceeds * self.fee
+            self.qty -= sell_qty
+        prev_total = self.total
+        self.t = min(self.t + 1, self.N - 1)
+        self.price = float(self.df.loc[self.t, "close"])
+        self._update_total()
+        reward = np.log(max(self.total, 1e-9) / max(prev_total, 1e-9)) - self.pen * abs(delta_w)
+        done = (self.t == self.N - 1)
+        return self._state(), float(reward), bool(done), {"total": self.total, "weight": (self.qty * self.price) / max(self.total, 1e-9)}
+
+    def _state(self):
+        row = self.df.loc[self.t, FEATURES].astype(float).values
+        pos = 0.0 if self.total <= 0 else (self.qty * self.price) / self.total
+        return np.concatenate([row, [pos]]).astype(np.float32)
+
+def run(env, actions):
+    env.reset()
+    rewards = []
+    t0 = time.perf_counter()
+    for a in actions:
+        s, r, done, _ = env.step(a)
+        rewards.append(r)
+        if done:
+            break
+    return len(rewards) / (time.perf_counter() - t0), np.array(rewards)
+
+def run_vector(df, starts, horizon, actions):
+    """같은 시작 오프셋의 단일 env K개를 순서대로 돌린 것과 벡터 env 한 번을 비교."""
+    singles = [DailyOHLCVEnv(df.iloc[s:s + horizon + 1]) for s in starts]
+    t0 = time.perf_counter()
+    r_loop = np.zeros((len(starts), horizon))
+    for k, env in enumerate(singles):
+        env.reset()
+        for i in range(horizon):
+            r_loop[k, i] = env.step(actions[k, i])[1]
+    loop_sps = r_loop.size / (time.perf_counter() - t0)
+
+    venv = VectorDailyOHLCVEnv(df, starts=starts, horizon=horizon)
+    venv.reset()
+    r_vec = np.zeros_like(r_loop)
+    t0 = time.perf_counter()
+    for i in range(horizon):
+        r_vec[:, i] = venv.step(actions[:, i])[1]
+    vec_sps = r_vec.size / (time.perf_counter() - t0)
+    return loop_sps, vec_sps, np.max(np.abs(r_loop - r_vec))
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--years", type=int, default=8)
+    p.add_argument("--envs", type=int, default=16)
+    args = p.parse_args()
+    df = synthetic_ohlcv(365 * args.years)
+    actions = np.random.default_rng(1).uniform(0, 1, len(df))
+    sps_old, r_old = run(PandasDailyOHLCVEnv(df), actions)
+    sps_new, r_new = run(DailyOHLCVEnv(df), actions)
+    print(f"rows={len(df)}")
+    print(f"pandas .loc : {sps_old:>12,.0f} steps/s")
+    print(f"array       : {sps_new:>12,.0f} steps/s  (x{sps_new / sps_old:.1f})")
+    print(f"max |reward diff| = {np.max(np.abs(r_old - r_new)):.3e}")
+
+    starts = np.arange(args.envs) * 20
+    horizon = len(df) - 1 - int(starts[-1])
+    acts = np.random.default_rng(2).uniform(0, 1, (args.envs, horizon))
+    loop_sps, vec_sps, diff = run_vector(df, starts, horizon, acts)
+    print(f"K={args.envs} single loop : {loop_sps:>12,.0f} env-steps/s")
+    print(f"K={args.envs} vector      : {vec_sps:>12,.0f} env-steps/s  (x{vec_sps / loop_sps:.1f})")
+    print(f"max |reward diff| = {diff:.3e}")
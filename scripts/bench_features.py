@@ -0,0 +1,73 @@
+"""분봉 피처 계산: pandas make_features (전체 프레임) vs 청크 스트리밍 load_features (memmap 캐시).
+
+시간/피크 메모리(tracemalloc), 새 bar append 후 증분 갱신 시간, 값 일치(make_features 기준) 확인.
+
+python -m scripts.bench_features --bars 2000000
+"""
+import argparse, tempfile, time, tracemalloc
+import numpy as np
+import pandas as pd
+from scripts.bench_env import synthetic_ohlcv
+from upbit_rl.data.store import OHLCVStore
+from upbit_rl.rl.environment import make_features, VectorDailyOHLCVEnv
+from upbit_rl.rl.features import load_features, FeatureStream, RollingStats
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    sec = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, sec, peak / 2**20
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--bars", type=int, default=2_000_000)
+    p.add_argument("--chunk", type=int, default=1 << 16)
+    args = p.parse_args()
+
+    store = OHLCVStore(tempfile.mkdtemp())
+    df = synthetic_ohlcv(args.bars + 1, seed=0)
+    df["date"] = pd.date_range("2021-01-01", periods=len(df), freq="min")
+    store.append("KRW-BTC", "minute1", df.iloc[:-1])
+    del df
+
+    (_, ref, _), t_pd, m_pd = measure(lambda: make_features(store.load("KRW-BTC", "minute1")))
+    (feats, close), t_st, m_st = measure(lambda: load_features(store, "KRW-BTC", "minute1", chunk=args.chunk))
+    err = np.abs(np.asarray(feats) - ref).max(axis=0)
+    print(f"{args.bars:,} minute1 bars")
+    print(f"pandas make_features   : {t_pd:6.2f}s  peak {m_pd:7.1f} MiB")
+    print(f"chunked load_features  : {t_st:6.2f}s  peak {m_st:7.1f} MiB  (cold, writes feats.f4)")
+    print(f"max |diff| ret/hl/v_z  : {err[0]:.2e} {err[1]:.2e} {err[2]:.2e}")
+    assert err.max() < 1e-4, err
+    del feats, close
+
+    # 새 bar 1개 -> 캐시 마지막 행부터만 다시 계산
+    new = synthetic_ohlcv(2, seed=1).iloc[1:].copy()
+    new["date"] = [pd.Timestamp("2021-01-01") + pd.Timedelta(minutes=args.bars)]
+    store.append("KRW-BTC", "minute1", new)
+    (feats, close), t_inc, m_inc = measure(lambda: load_features(store, "KRW-BTC", "minute1"))
+    print(f"append 1 bar + refresh : {t_inc * 1e3:6.1f}ms peak {m_inc:7.1f} MiB")
+    _, full, _ = make_features(store.load("KRW-BTC", "minute1", count=600))
+    assert len(feats) == args.bars + 1 and np.abs(feats[-540:] - full[-540:]).max() < 1e-4
+
+    # 실시간 bar 1개씩 (O(1)) == 청크 결과
+    fs, cols = FeatureStream(), store.arrays("KRW-BTC", "minute1")
+    n = 100_000
+    t0 = time.perf_counter()
+    rows = [fs.step(cols["high"][i], cols["low"][i], cols["close"][i], cols["volume"][i]) for i in range(n)]
+    t_step = (time.perf_counter() - t0) / n
+    assert np.abs(np.stack(rows) - feats[:n]).max() < 1e-4
+    rs = RollingStats(60)
+    t0 = time.perf_counter()
+    for x in np.log(cols["volume"][:n] + 1.0):
+        rs.push(x)
+    t_push = (time.perf_counter() - t0) / n
+    print(f"FeatureStream.step     : {t_step * 1e6:6.1f}us/bar, RollingStats.push {t_push * 1e6:.1f}us")
+
+    env = VectorDailyOHLCVEnv((feats, close), starts=np.arange(16) * 10_000, horizon=1440)
+    s, done = env.reset(), False
+    while not done:
+        s, r, d, _ = env.step(np.full(env.K, 0.5)); done = d[0]
+    print(f"VectorDailyOHLCVEnv on memmap features: K={env.K} horizon={env.N - 1} ok")
@@ -0,0 +1,34 @@
+"""step 당 추론 지연 측정: actor.predict + critic.predict (이전) vs Policy tf.function (현재).
+
+python -m scripts.bench_inference --window 30 --batch 1 --steps 200
+"""
+import argparse, time
+import numpy as np
+from upbit_rl.rl.networks import make_actor_beta, make_critic
+from upbit_rl.rl.inference import Policy
+
+def timeit(fn, x, steps):
+    fn(x)  # warm-up (트레이싱/빌드 제외)
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        out = fn(x)
+    return (time.perf_counter() - t0) / steps * 1e3, out
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--window", type=int, default=30)
+    p.add_argument("--dim", type=int, default=4)
+    p.add_argument("--batch", type=int, default=1)
+    p.add_argument("--steps", type=int, default=200)
+    args = p.parse_args()
+
+    actor, critic = make_actor_beta(args.dim), make_critic(args.dim)
+    x = np.random.default_rng(0).normal(size=(args.batch, args.window, args.dim)).astype(np.float32)
+    policy = Policy(actor, critic)
+
+    ms_old, (ab_old, v_old) = timeit(lambda s: (actor.predict(s, verbose=0), critic.predict(s, verbose=0)), x, args.steps)
+    ms_new, (ab_new, v_new) = timeit(policy, x, args.steps)
+    print(f"batch={args.batch} window={args.window}")
+    print(f"predict x2   : {ms_old:8.3f} ms/step")
+    print(f"tf.function  : {ms_new:8.3f} ms/step  (x{ms_old / ms_new:.1f})")
+    print(f"max |diff| ab={np.max(np.abs(ab_old - ab_new)):.2e} v={np.max(np.abs(v_old - v_new)):.2e}")
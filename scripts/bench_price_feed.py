@@ -0,0 +1,115 @@
+"""UpbitClient.get_price: REST 폴링 vs WebSocket 피드 테이블 (로컬 가짜 Upbit ticker 서버).
+
+REST 는 --rest_ms 지연을 넣은 대체 함수로 호출 수를 센다 (네트워크 없이).
+확인: 피드 조회 지연, 피드가 멈추면 max_age 후 REST 대체, 연결 끊김 후 재연결/재구독.
+python -m scripts.bench_price_feed --tickers 20 --rate 10
+"""
+import argparse, asyncio, json, threading, time
+import websockets
+from upbit_rl.broker import upbit_client
+from upbit_rl.broker.upbit_client import UpbitClient
+
+class FakeTickerServer:
+    """구독 요청을 받아 마켓마다 초당 rate 개 ticker 메시지(bytes, Upbit DEFAULT 형식)를 보낸다."""
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.paused = threading.Event()
+        self.connections = 0
+        self._clients = set()
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+        self.ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._serve())
+
+    async def _serve(self):
+        async with websockets.serve(self._handler, "127.0.0.1", 0) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self.ready.set()
+            await asyncio.Future()
+
+    async def _handler(self, ws):
+        self.connections += 1
+        self._clients.add(ws)
+        codes = json.loads(await ws.recv())[1]["codes"]
+        k = 0
+        try:
+            while True:
+                if not self.paused.is_set():
+                    for c in codes:
+                        await ws.send(json.dumps({"type": "ticker", "code": c, "trade_price": 1e6 + k,
+                                                  "timestamp": int(time.time() * 1e3)}).encode())
+                    k += 1
+                await asyncio.sleep(1.0 / self.rate)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._clients.discard(ws)
+
+    def drop_all(self):
+        for ws in list(self._clients):
+            asyncio.run_coroutine_threadsafe(ws.close(), self.loop)
+
+class FakeREST:
+    def __init__(self, ms):
+        self.ms, self.calls = ms, 0
+
+    def get_current_price(self, t):
+        self.calls += 1
+        time.sleep(self.ms / 1e3)
+        return {x: 1e6 for x in t}
+
+def per_call(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=20)
+    p.add_argument("--rate", type=float, default=10.0, help="마켓당 초당 ticker 메시지")
+    p.add_argument("--rest_ms", type=float, default=30.0, help="대체 REST 응답 지연")
+    p.add_argument("--max_age", type=float, default=1.0)
+    args = p.parse_args()
+
+    rest = FakeREST(args.rest_ms)
+    upbit_client.get_current_price = rest.get_current_price
+    tickers = [f"KRW-T{i:02d}" for i in range(args.tickers)]
+
+    rest_client = UpbitClient(max_age=0.0)  # 캐시 없이 매번 REST (최악)
+    us_rest = per_call(lambda: rest_client.get_price(tickers[0]), 20)
+
+    server = FakeTickerServer(args.rate)
+    client = UpbitClient(max_age=args.max_age)
+    t0 = time.perf_counter()
+    feed = client.subscribe(tickers, url=f"ws://127.0.0.1:{server.port}")
+    t_first = time.perf_counter() - t0
+    calls0 = rest.calls
+    us_feed = per_call(lambda: client.get_price(tickers[0]), 100_000)
+    us_many = per_call(lambda: client.get_prices(tickers), 10_000)
+    assert rest.calls == calls0, "feed hit must not touch REST"
+    print(f"REST get_price      : {us_rest:10.1f} us/call")
+    print(f"feed get_price      : {us_feed:10.3f} us/call  (first prices for {len(tickers)} markets in {t_first * 1e3:.0f} ms)")
+    print(f"feed get_prices({len(tickers)}) : {us_many:10.3f} us/call, REST calls: 0")
+
+    # 피드 정지 -> max_age 후 REST 대체 -> 재개
+    server.paused.set()
+    time.sleep(args.max_age + 0.2)
+    client.get_prices(tickers)
+    stale_calls = rest.calls - calls0
+    server.paused.clear()
+    time.sleep(3.0 / args.rate)
+    before = rest.calls
+    client.get_prices(tickers)
+    print(f"stale feed (> {args.max_age}s): {stale_calls} batched REST call(s); after resume REST calls: {rest.calls - before}")
+
+    # 연결 끊김 -> 재연결/재구독
+    server.drop_all()
+    time.sleep(2.0)
+    ok = feed.wait(2.0) and max(feed.age(t) for t in tickers) < args.max_age
+    print(f"reconnects: {feed.reconnects} (server connections {server.connections}), fresh after reconnect: {ok}")
+    client.close()
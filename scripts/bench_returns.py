@@ -0,0 +1,58 @@
+"""rl.returns 확인: 기존 discounted 역방향 루프와 값 비교 + 긴 에피소드 속도.
+
+- discounted (블록 닫힌 식) vs 이전 train.py/train_ppo.py 루프: gamma x 길이 조합 최대 차이
+- gae(lam=1) == discounted(r) - V (이전 학습 루프의 advantage), gae(lam) vs 단순 역방향 GAE 루프
+- (K, T) 배치 속도: 이전 (행마다 루프) vs 벡터화
+python -m scripts.bench_returns --envs 16 --steps 200000
+"""
+import argparse, time
+import numpy as np
+from upbit_rl.rl.returns import discounted, gae
+
+def legacy_discounted(rs, gamma=0.99):
+    out=[]; g=0.0
+    for r in rs[::-1]:
+        g = r + gamma*g; out.append(g)
+    return np.array(out[::-1], dtype=np.float32)
+
+def legacy_gae(r, v, gamma, lam):
+    adv = np.zeros(r.shape, dtype=np.float64); last = 0.0
+    for t in reversed(range(r.shape[-1])):
+        v_next = v[..., t + 1] if t + 1 < r.shape[-1] else 0.0
+        last = r[..., t] + gamma * v_next - v[..., t] + gamma * lam * last
+        adv[..., t] = last
+    return adv
+
+def rel_err(a, b):
+    return float(np.abs(a - b).max() / (np.abs(b).max() + 1e-12))
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--envs", type=int, default=16)
+    p.add_argument("--steps", type=int, default=200_000)
+    args = p.parse_args()
+    rng = np.random.default_rng(0)
+
+    worst = 0.0
+    for T in (1, 7, 255, 256, 257, 5000):
+        for gamma in (0.0, 0.5, 0.9, 0.99, 0.999, 1.0):
+            r = rng.normal(0, 0.01, (3, T)).astype(np.float32)
+            worst = max(worst, rel_err(discounted(r, gamma), np.stack([legacy_discounted(x, gamma) for x in r])))
+    print(f"discounted vs legacy loop: max rel err {worst:.1e} (T up to 5000, gamma 0..1)")
+
+    r = rng.normal(0, 0.01, (4, 3000)).astype(np.float32)
+    v = rng.normal(0, 0.1, (4, 3000)).astype(np.float32)
+    adv, ret = gae(r, v, 0.99, 1.0)
+    ref = np.stack([legacy_discounted(x) for x in r])
+    print(f"gae(lam=1) vs discounted - V: max abs err {np.abs(adv - (ref - v)).max():.1e}, returns {np.abs(ret - ref).max():.1e}")
+    for lam in (0.0, 0.9, 0.95):
+        print(f"gae(lam={lam}) vs reference loop: max abs err {np.abs(gae(r, v, 0.99, lam)[0] - legacy_gae(r.astype(np.float64), v.astype(np.float64), 0.99, lam)).max():.1e}")
+
+    K, T = args.envs, args.steps
+    r = rng.normal(0, 0.01, (K, T)).astype(np.float32)
+    v = rng.normal(0, 0.1, (K, T)).astype(np.float32)
+    t0 = time.perf_counter(); a = np.stack([legacy_discounted(x) for x in r]); t_old = time.perf_counter() - t0
+    t0 = time.perf_counter(); b = discounted(r); t_new = time.perf_counter() - t0
+    t0 = time.perf_counter(); gae(r, v, 0.99, 0.95); t_gae = time.perf_counter() - t0
+    print(f"(K={K}, T={T:,}) legacy {t_old:.3f}s, vectorized {t_new:.3f}s ({t_old / t_new:.1f}x), "
+          f"gae {t_gae:.3f}s | max abs err {np.abs(a - b).max():.1e}")
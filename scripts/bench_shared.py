@@ -0,0 +1,49 @@
+"""학습 처리량 비교: actor/critic 두 타워 vs 공유 트렁크 (make_actor_critic).
+
+rollout forward (K개 배치, steps/s) 와 PPO gradient step 시간 (B개 window) 을 측정.
+python -m scripts.bench_shared --envs 16 --batch 512
+"""
+import argparse, time
+import numpy as np
+import tensorflow as tf
+from upbit_rl.rl.networks import make_actor_beta, make_critic, make_actor_critic
+from upbit_rl.rl.inference import Policy
+from upbit_rl.train_ppo import make_update
+
+def bench(actor, critic, args):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(args.envs, args.window, args.dim)).astype(np.float32)
+    policy = Policy(actor, critic)
+    policy(x)
+    t0 = time.perf_counter()
+    for _ in range(args.steps):
+        policy(x)
+    sps = args.steps * args.envs / (time.perf_counter() - t0)
+
+    B = args.batch
+    S = tf.constant(rng.normal(size=(B, args.window, args.dim)), dtype=tf.float32)
+    A = tf.constant(rng.uniform(0.05, 0.95, (B, 1)), dtype=tf.float32)
+    old_logp = tf.zeros((B, 1)); adv = tf.constant(rng.normal(size=(B, 1)), dtype=tf.float32)
+    ret = tf.constant(rng.normal(size=B), dtype=tf.float32)
+    update = make_update(actor, critic, tf.keras.optimizers.Adam(1e-3), tf.keras.optimizers.Adam(1e-3))
+    update(S, A, old_logp, adv, ret)
+    t0 = time.perf_counter()
+    for _ in range(args.updates):
+        update(S, A, old_logp, adv, ret)
+    return sps, (time.perf_counter() - t0) / args.updates * 1e3
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--envs", type=int, default=16)
+    p.add_argument("--window", type=int, default=30)
+    p.add_argument("--dim", type=int, default=4)
+    p.add_argument("--steps", type=int, default=200)
+    p.add_argument("--batch", type=int, default=512)
+    p.add_argument("--updates", type=int, default=10)
+    args = p.parse_args()
+
+    sps_2, upd_2 = bench(make_actor_beta(args.dim), make_critic(args.dim), args)
+    sps_1, upd_1 = bench(make_actor_critic(args.dim), None, args)
+    print(f"K={args.envs} window={args.window} update batch={args.batch}")
+    print(f"two-tower : rollout {sps_2:>10,.0f} steps/s   update {upd_2:8.1f} ms/step")
+    print(f"shared    : rollout {sps_1:>10,.0f} steps/s   update {upd_1:8.1f} ms/step")
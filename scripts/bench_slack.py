@@ -0,0 +1,71 @@
+"""SlackNotifier send() 지연: 동기 전송 vs background 큐 (로컬 가짜 webhook 서버).
+
+서버는 요청마다 --latency 초 지연, 첫 요청은 429 + Retry-After. 연결 수/HTTP 요청 수/전달 순서도 확인.
+python -m scripts.bench_slack --messages 50 --latency 0.2
+"""
+import argparse, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from upbit_rl.notify.slack import SlackNotifier
+
+def make_handler(latency):
+    stats = {"requests": 0, "connections": 0, "429": 0, "texts": []}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *a):
+            pass
+
+        def setup(self):
+            super().setup()
+            with lock:
+                stats["connections"] += 1
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            with lock:
+                stats["requests"] += 1
+                limited = stats["requests"] == 1
+                if limited:
+                    stats["429"] += 1
+                else:
+                    stats["texts"].append(body["text"])
+            self.send_response(429 if limited else 200)
+            if limited:
+                self.send_header("Retry-After", "0.3")
+            self.send_header("Content-Length", "2"); self.end_headers()
+            self.wfile.write(b"ok")
+    return Handler, stats
+
+def run(background, n, latency):
+    handler, stats = make_handler(latency)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    notifier = SlackNotifier(webhook_url=f"http://127.0.0.1:{server.server_port}/hook", background=background)
+    lat = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        s = time.perf_counter()
+        notifier.send(f"msg {i}")
+        lat.append(time.perf_counter() - s)
+    t_send = time.perf_counter() - t0
+    notifier.close()
+    t_all = time.perf_counter() - t0
+    server.shutdown()
+    lines = [l for t in stats["texts"] for l in t.split("\n")]
+    assert lines == [f"msg {i}" for i in range(n)], lines[:5]
+    lat = np.array(lat) * 1e6
+    mode = "background" if background else "sync      "
+    print(f"{mode}: send() p50 {np.median(lat):10.1f}us max {lat.max():10.1f}us | caller blocked {t_send:6.2f}s, "
+          f"delivered in {t_all:6.2f}s | {stats['requests']} POSTs (429: {stats['429']}), {stats['connections']} connection(s)")
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--messages", type=int, default=50)
+    p.add_argument("--latency", type=float, default=0.2, help="가짜 서버 응답 지연 (초)")
+    args = p.parse_args()
+    run(False, args.messages, args.latency)
+    run(True, args.messages, args.latency)
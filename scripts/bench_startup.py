@@ -0,0 +1,78 @@
+"""진입점 시작 시간 + 추론 전용 NumPy actor 확인.
+
+1) 모듈마다 새 인터프리터에서 import 만 하는 시간 (중앙값, 빈 인터프리터 시간 제외).
+2) 첫 결정까지: import + actor 로드 + Agent.act 1회 - Keras (.keras) vs NumPy (.npz).
+3) NumpyPolicy vs tf.function Policy: 출력 차이(0 패딩 Masking 포함), stateful step, 호출 지연.
+python -m scripts.bench_startup --runs 5
+"""
+import argparse, os, subprocess, sys, tempfile, time
+import numpy as np
+
+ENTRY_POINTS = ["upbit_rl.trade", "upbit_rl.daemon", "upbit_rl.backtest", "scripts.test_upbit",
+                "scripts.test_slack", "upbit_rl.train_ppo"]
+
+FIRST_DECISION = """
+import time; t0 = time.perf_counter()
+import numpy as np
+from upbit_rl.rl.agent import Agent, load_actor
+agent = Agent(load_actor({path!r}), explore=False)
+w = agent.act(np.zeros((1, 30, 4), dtype=np.float32) + 0.1)
+print(time.perf_counter() - t0)
+"""
+
+def wall(code: str, runs: int) -> float:
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        out.append(time.perf_counter() - t0)
+    return float(np.median(out))
+
+def per_call(fn, n):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--window", type=int, default=30)
+    args = p.parse_args()
+
+    base = wall("pass", args.runs)
+    print(f"interpreter: {base:.2f}s (subtracted below)")
+    for mod in ENTRY_POINTS:
+        print(f"import {mod:22s}: {wall(f'import {mod}', args.runs) - base:6.2f}s")
+
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+    import tensorflow as tf
+    from upbit_rl.rl.networks import make_actor_beta, make_actor_critic
+    from upbit_rl.rl.inference import Policy, StatefulPolicy
+    from upbit_rl.rl.numpy_policy import NumpyPolicy, export_npz
+
+    tmp = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+    for name, make in (("two-tower actor", make_actor_beta), ("shared trunk", make_actor_critic)):
+        model = make(4)
+        model.set_weights([w + rng.normal(0, 0.1, w.shape).astype(np.float32) for w in model.get_weights()])  # 0 bias 가 아닌 값으로
+        keras_path = os.path.join(tmp, f"{make.__name__}.keras")
+        model.save(keras_path)
+        npz_path = export_npz(model, os.path.join(tmp, f"{make.__name__}.npz"))
+        np_pol, tf_pol = NumpyPolicy.load(npz_path), Policy(model)
+
+        x = rng.normal(size=(16, args.window, 4)).astype(np.float32)
+        x[:4, :10] = 0.0  # 앞쪽 0 패딩 (Masking)
+        d_ab = max(np.abs(a - b).max() for a, b in zip(np_pol(x), tf_pol(x)))
+        np_st, tf_st = np_pol.stateful(batch=2), StatefulPolicy(model, batch=2)
+        d_step = 0.0
+        for t in range(args.window):
+            d_step = max(d_step, max(np.abs(a - b).max() for a, b in zip(np_st.step(x[:2, t]), tf_st.step(x[:2, t]))))
+        one = x[4:5]
+        print(f"{name}: max |numpy - tf| window {d_ab:.1e}, stateful step {d_step:.1e} | "
+              f"act latency numpy {per_call(lambda: np_pol(one), 200):.0f}us, tf.function {per_call(lambda: tf_pol(one), 200):.0f}us")
+
+    for path in (keras_path, npz_path):
+        print(f"first decision ({os.path.splitext(path)[1]}): {wall(FIRST_DECISION.format(path=path), args.runs) - base:6.2f}s")
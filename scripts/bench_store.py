@@ -0,0 +1,41 @@
+"""OHLCV 로딩 시간: 티커별 CSV (이전 캐시) vs OHLCVStore (컬럼 바이너리 + memmap).
+
+python -m scripts.bench_store --tickers 50 --years 8
+"""
+import argparse, tempfile, time, pathlib
+import numpy as np
+from scripts.bench_env import synthetic_ohlcv
+from upbit_rl.data.store import OHLCVStore
+import pandas as pd
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=50)
+    p.add_argument("--years", type=int, default=8)
+    args = p.parse_args()
+
+    root = pathlib.Path(tempfile.mkdtemp())
+    store = OHLCVStore(root / "store")
+    tickers = [f"KRW-T{i:03d}" for i in range(args.tickers)]
+    n = 365 * args.years
+    for i, t in enumerate(tickers):
+        df = synthetic_ohlcv(n, seed=i)
+        df.to_csv(root / f"{t}.csv", index=False)
+        store.append(t, "day", df.iloc[:-30])
+        store.append(t, "day", df.iloc[-31:])  # 증분 append (마지막 bar 덮어쓰기 포함)
+    assert all(store.size(t) == n for t in tickers)
+
+    t0 = time.perf_counter()
+    csv = [pd.read_csv(root / f"{t}.csv") for t in tickers]
+    t_csv = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    loaded = [store.load(t, "day") for t in tickers]
+    t_store = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    closes = [store.arrays(t, "day")["close"] for t in tickers]
+    t_map = time.perf_counter() - t0
+    assert all(np.allclose(a["close"], b["close"]) for a, b in zip(csv, loaded))
+    print(f"{args.tickers} tickers x {n} bars")
+    print(f"read_csv        : {t_csv * 1e3:8.1f} ms")
+    print(f"store.load      : {t_store * 1e3:8.1f} ms  (x{t_csv / t_store:.1f})")
+    print(f"store.arrays    : {t_map * 1e3:8.1f} ms  (memmap, zero-copy)")
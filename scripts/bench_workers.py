@@ -0,0 +1,45 @@
+"""PPO rollout 수집 처리량: 학습 프로세스 단독 vs --workers N.
+
+워커 기동/트레이싱을 빼기 위해 1회 warm-up 후 에피소드 수집 wall-clock 과 samples/s 를 잰다.
+python -m scripts.bench_workers --envs 16 --horizon 500 --workers 0 1 2 4
+"""
+import argparse, time
+import numpy as np
+from scripts.bench_env import synthetic_ohlcv
+from upbit_rl.rl.environment import ObservationWindow
+from upbit_rl.rl.inference import Policy
+from upbit_rl.train_ppo import make_env, make_models, rollout, RolloutPool
+
+def timed(fn, reps):
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t0) / reps
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--envs", type=int, default=16)
+    p.add_argument("--stride", type=int, default=20)
+    p.add_argument("--horizon", type=int, default=500)
+    p.add_argument("--window", type=int, default=30)
+    p.add_argument("--reps", type=int, default=2)
+    p.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = p.parse_args()
+
+    starts = np.arange(args.envs) * args.stride
+    df = synthetic_ohlcv(int(starts[-1]) + args.horizon + 1)
+    env = make_env(df, starts, args.horizon, args.window)
+    input_dim = env._state().shape[1]
+    actor, critic = make_models(input_dim)
+    samples = args.envs * args.horizon
+    print(f"envs={args.envs} horizon={args.horizon} -> {samples} samples/episode")
+    for n in args.workers:
+        if n == 0:
+            policy, win = Policy(actor, critic), ObservationWindow(args.window, input_dim, batch=env.K)
+            sec = timed(lambda: rollout(env, win, policy, args.window), args.reps)
+        else:
+            pool = RolloutPool(n, df, starts, args.horizon, {"window": args.window, "shared": False})
+            sec = timed(lambda: pool.collect(actor, critic), args.reps)
+            pool.close()
+        print(f"workers={n}: {sec:7.2f} s/episode  {samples / sec:>10,.0f} samples/s")
@@ -0,0 +1,42 @@
+"""StatefulPolicy(증분 LSTM) 와 전체 시퀀스 Policy 의 수치 동등성 + step 지연 비교.
+
+python -m scripts.check_stateful --steps 120 --batch 4
+"""
+import argparse, time
+import numpy as np
+from upbit_rl.rl.networks import make_actor_beta, make_critic
+from upbit_rl.rl.inference import Policy, StatefulPolicy
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--steps", type=int, default=120)
+    p.add_argument("--batch", type=int, default=4)
+    p.add_argument("--window", type=int, default=30)
+    p.add_argument("--dim", type=int, default=4)
+    args = p.parse_args()
+
+    actor, critic = make_actor_beta(args.dim), make_critic(args.dim)
+    x = np.random.default_rng(0).normal(size=(args.batch, args.steps, args.dim)).astype(np.float32)
+    x[:, :3] = 0.0  # 앞쪽 0 패딩 행 (Masking 과 같은 처리 확인)
+    full, inc = Policy(actor, critic), StatefulPolicy(actor, critic, batch=args.batch)
+
+    err_ab = err_v = 0.0
+    for t in range(args.steps):
+        ab_f, v_f = full(x[:, :t + 1])
+        ab_i, v_i = inc.step(x[:, t])
+        err_ab = max(err_ab, float(np.max(np.abs(ab_f - ab_i))))
+        err_v = max(err_v, float(np.max(np.abs(v_f - v_i))))
+    print(f"max |full - incremental| ab={err_ab:.2e} v={err_v:.2e}")
+    assert err_ab < 1e-4 and err_v < 1e-4, "incremental path diverged from full-sequence path"
+
+    t0 = time.perf_counter()
+    for t in range(args.steps):
+        full(x[:, max(0, t + 1 - args.window):t + 1])
+    ms_full = (time.perf_counter() - t0) / args.steps * 1e3
+    inc.reset()
+    t0 = time.perf_counter()
+    for t in range(args.steps):
+        inc.step(x[:, t])
+    ms_inc = (time.perf_counter() - t0) / args.steps * 1e3
+    print(f"window={args.window} full : {ms_full:7.3f} ms/step")
+    print(f"incremental     : {ms_inc:7.3f} ms/step  (x{ms_full / ms_inc:.1f})")
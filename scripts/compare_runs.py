@@ -0,0 +1,35 @@
+"""학습 run 두 개의 metrics.jsonl 비교: 단계별 시간/throughput 중앙값과 비율. 처리량이 tol 이상 떨어지면 exit 1.
+
+첫 epoch (tf.function 트레이싱 포함) 은 기본으로 제외.
+python -m scripts.compare_runs runs/base runs/new --tol 0.1
+"""
+import argparse, sys
+import numpy as np
+from upbit_rl.rl.profiler import load_metrics
+
+def medians(rows, skip):
+    rows = rows[skip:] or rows
+    keys = sorted({k for r in rows for k in r if k.startswith(("time/", "throughput/"))})
+    return {k: float(np.median([r[k] for r in rows if k in r])) for k in keys}
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("base")
+    p.add_argument("new")
+    p.add_argument("--skip", type=int, default=1, help="앞쪽 warm-up epoch 제외 개수")
+    p.add_argument("--tol", type=float, default=0.1, help="허용 throughput 하락 비율")
+    args = p.parse_args()
+
+    base, new = medians(load_metrics(args.base), args.skip), medians(load_metrics(args.new), args.skip)
+    bad = []
+    print(f"{'metric':40s} {'base':>12s} {'new':>12s} {'new/base':>9s}")
+    for k in sorted(set(base) | set(new)):
+        b, n = base.get(k, np.nan), new.get(k, np.nan)
+        ratio = n / b if b else np.nan
+        flag = ""
+        if k.startswith("throughput/") and ratio < 1.0 - args.tol:
+            bad.append(k); flag = "  <- regression"
+        print(f"{k:40s} {b:12.4g} {n:12.4g} {ratio:9.2f}{flag}")
+    if bad:
+        print(f"throughput regression (> {args.tol:.0%}): {', '.join(bad)}")
+        sys.exit(1)
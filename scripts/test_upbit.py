@@ -1,11 +1,13 @@
-import os
+import os, sys
 from upbit_rl.broker.upbit_client import UpbitClient
-from upbit_rl.data.ohlcv import get_ohlcv
 
 if __name__ == "__main__":
     t = os.getenv("TICKER","KRW-BTC")
     client = UpbitClient()
     price = client.get_price(t)
     print("current price", t, price)
+    if "--price" in sys.argv:  # 시세만: pandas/pyupbit import 없이 끝
+        sys.exit(0)
+    from upbit_rl.data.ohlcv import get_ohlcv
     df = get_ohlcv(t, count=30, force=True)
-    print("ohlcv rows", len(df), "cols", list(df.columns))
\ No newline at end of file
+    print("ohlcv rows", len(df), "cols", list(df.columns))
@@ -0,0 +1,48 @@
+import glob, os
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+from upbit_rl.rl.checkpoint import Checkpointer
+from upbit_rl.rl.networks import make_actor_beta, make_critic
+
+def build(seed):
+    tf.keras.utils.set_random_seed(seed)
+    return make_actor_beta(4), make_critic(4), tf.keras.optimizers.Adam(1e-3), tf.keras.optimizers.Adam(1e-3)
+
+def train_step(model, opt):
+    x = np.random.normal(size=(2, 5, 4)).astype(np.float32)
+    with tf.GradientTape() as tape:
+        loss = tf.reduce_mean(tf.square(model(x, training=True)))
+    opt.apply_gradients(zip(tape.gradient(loss, model.trainable_weights), model.trainable_weights))
+
+def test_save_restore_round_trip(tmp_path):
+    actor, critic, opt_a, opt_c = build(0)
+    for _ in range(3):
+        train_step(actor, opt_a); train_step(critic, opt_c)
+    ck = Checkpointer(str(tmp_path), {"actor": actor, "critic": critic}, {"actor": opt_a, "critic": opt_c}, keep=2)
+    for ep in (2, 3, 4):
+        ck.save(ep)
+    after_save = np.random.random(5)
+
+    # 다른 시드의 새 모델/옵티마이저 (슬롯 변수는 아직 없음) + 흐트러진 RNG 에서 복원
+    actor2, critic2, opt_a2, opt_c2 = build(1)
+    np.random.seed(123)
+    ck2 = Checkpointer(str(tmp_path), {"actor": actor2, "critic": critic2}, {"actor": opt_a2, "critic": opt_c2}, keep=2)
+    assert ck2.restore() == 5
+    for a, b in ((actor, actor2), (critic, critic2)):
+        for w, w2 in zip(a.get_weights(), b.get_weights()):
+            np.testing.assert_array_equal(w, w2)
+    for o, o2 in ((opt_a, opt_a2), (opt_c, opt_c2)):
+        assert int(o2.iterations.numpy()) == int(o.iterations.numpy()) == 3
+        for v, v2 in zip(o.variables, o2.variables):
+            np.testing.assert_array_equal(v.numpy(), v2.numpy())
+    np.testing.assert_array_equal(np.random.random(5), after_save)
+
+    # keep=2: 오래된 ckpt 와 그 RNG 파일은 정리
+    assert sorted(os.path.basename(f) for f in glob.glob(str(tmp_path / "ckpt-*.rng.npz"))) == ["ckpt-3.rng.npz", "ckpt-4.rng.npz"]
+
+def test_restore_without_checkpoint(tmp_path):
+    actor, critic, opt_a, opt_c = build(0)
+    ck = Checkpointer(str(tmp_path), {"actor": actor, "critic": None}, {"actor": opt_a, "critic": None})
+    assert ck.restore() == 0
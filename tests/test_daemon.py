@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+from upbit_rl.daemon import next_close
+
+T = pd.Timestamp
+
+@pytest.mark.parametrize("now,interval,close", [
+    ("2026-10-18 10:30", "minute240", "2026-10-18 13:00"),   # 4시간봉: UTC 경계 = 01/05/09/13/17/21 KST
+    ("2026-10-18 00:30", "minute240", "2026-10-18 01:00"),
+    ("2026-10-18 21:00", "minute240", "2026-10-19 01:00"),   # 마감 시각 정각이면 다음 마감
+    ("2026-10-18 10:30", "minute60", "2026-10-18 11:00"),
+    ("2026-10-18 23:59:59", "minute60", "2026-10-19 00:00"),
+    ("2026-10-18 10:31", "minute1", "2026-10-18 10:32"),
+    ("2026-10-18 08:59", "day", "2026-10-18 09:00"),
+    ("2026-10-18 09:00", "day", "2026-10-19 09:00"),
+])
+def test_next_close(now, interval, close):
+    assert next_close(T(now), interval) == T(close)
+
+def test_next_close_rejects_other_intervals():
+    with pytest.raises(ValueError):
+        next_close(T("2026-10-18 10:30"), "week")
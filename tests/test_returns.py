@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from upbit_rl.rl.returns import discounted, gae
+
+def loop_discounted(rs, gamma):
+    out, g = np.zeros(len(rs)), 0.0
+    for t in reversed(range(len(rs))):
+        g = rs[t] + gamma * g
+        out[t] = g
+    return out
+
+def loop_gae(r, v, gamma, lam, last=0.0):
+    adv, a = np.zeros(len(r)), 0.0
+    for t in reversed(range(len(r))):
+        v_next = v[t + 1] if t + 1 < len(r) else last
+        a = r[t] + gamma * v_next - v[t] + gamma * lam * a
+        adv[t] = a
+    return adv
+
+@pytest.mark.parametrize("T", [0, 1, 7, 256, 257, 1000])
+@pytest.mark.parametrize("gamma", [0.0, 0.5, 0.99, 1.0])
+def test_discounted_matches_loop(T, gamma):
+    r = np.random.default_rng(T).normal(0, 0.01, T).astype(np.float32)
+    out = discounted(r, gamma)
+    assert out.shape == (T,) and out.dtype == np.float32
+    np.testing.assert_allclose(out, loop_discounted(r.astype(np.float64), gamma), rtol=1e-5, atol=1e-7)
+
+def test_discounted_edges():
+    assert discounted(np.zeros(0, dtype=np.float32)).shape == (0,)
+    np.testing.assert_allclose(discounted([0.3], 0.99), [0.3])
+    np.testing.assert_allclose(discounted([1.0, 2.0, 3.0], 0.0), [1.0, 2.0, 3.0])
+    np.testing.assert_allclose(discounted([1.0, 2.0, 3.0], 1.0), [6.0, 5.0, 3.0])
+
+def test_batch_shape_matches_rows():
+    r = np.random.default_rng(0).normal(0, 0.01, (4, 300)).astype(np.float32)
+    v = np.random.default_rng(1).normal(0, 0.1, (4, 300)).astype(np.float32)
+    out = discounted(r, 0.99)
+    assert out.shape == (4, 300)
+    np.testing.assert_allclose(out, np.stack([discounted(x, 0.99) for x in r]), rtol=1e-6, atol=1e-7)
+    adv, ret = gae(r, v, 0.99, 0.95)
+    assert adv.shape == ret.shape == (4, 300) and adv.dtype == ret.dtype == np.float32
+    for k in range(4):
+        np.testing.assert_allclose(adv[k], gae(r[k], v[k], 0.99, 0.95)[0], rtol=1e-6, atol=1e-7)
+    assert discounted(np.zeros((3, 0), dtype=np.float32)).shape == (3, 0)
+    assert gae(np.zeros((3, 0)), np.zeros((3, 0)))[0].shape == (3, 0)
+
+@pytest.mark.parametrize("gamma", [0.0, 0.9, 0.99, 1.0])
+def test_gae_lam1_is_discounted_minus_value(gamma):
+    rng = np.random.default_rng(2)
+    r = rng.normal(0, 0.01, (3, 500)).astype(np.float32)
+    v = rng.normal(0, 0.1, (3, 500)).astype(np.float32)
+    adv, ret = gae(r, v, gamma, 1.0)
+    np.testing.assert_allclose(adv, discounted(r, gamma) - v, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(ret, discounted(r, gamma), rtol=1e-5, atol=1e-6)
+
+@pytest.mark.parametrize("T", [1, 5, 300])
+@pytest.mark.parametrize("gamma,lam", [(0.0, 0.95), (0.99, 0.0), (0.99, 0.95), (1.0, 1.0)])
+def test_gae_matches_loop(T, gamma, lam):
+    rng = np.random.default_rng(T)
+    r, v = rng.normal(0, 0.01, T), rng.normal(0, 0.1, T)
+    adv, ret = gae(r, v, gamma, lam, last_value=0.2)
+    ref = loop_gae(r, v, gamma, lam, last=0.2)
+    np.testing.assert_allclose(adv, ref, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(ret, ref + v, rtol=1e-5, atol=1e-6)
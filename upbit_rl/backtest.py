@@ -0,0 +1,198 @@
+# upbit_rl/backtest.py
+"""저장된 actor 를 과거 전체 구간에 대해 평가.
+
+1) 추론: 모든 시점의 window 를 (포지션 값 grid 개씩) 큰 배치로 한 번에 forward -> 목표 비중 표 (N, G).
+   실거래(trade.py) 와 같이 window 의 포지션 열은 현재 비중으로 채운다. 실제 비중은 grid 사이 선형보간.
+2) 시뮬레이션: 체결/수수료는 environment.fill (DailyOHLCVEnv.step 과 같은 계산), thresh 값들은 (C,) 배열로 lockstep.
+여러 체크포인트/thresh 는 --workers N 프로세스 풀로 나눠 돈다.
+--tickers 면 PortfolioOHLCVEnv 로 trade.py 포트폴리오 경로(티커별 1/M 슬리브) 를 bar 단위로 재생한다.
+
+python -m upbit_rl.backtest --models models/actor_latest.keras --thresh 0,0.02,0.05,0.1
+python -m upbit_rl.backtest --tickers KRW-BTC,KRW-ETH --thresh 0.02,0.05
+"""
+import argparse, glob, os, time, multiprocessing as mp
+import numpy as np
+import pandas as pd
+from .data.ohlcv import get_ohlcv
+from .data.store import OHLCVStore, interval_delta
+from .rl.environment import fill, align_ohlcv, PortfolioOHLCVEnv, FEATURES
+from .rl.features import load_features
+from .rl.agent import Agent, load_actor
+
+MIN_KRW = int(os.getenv("MIN_ORDER_KRW", "5000"))
+
+def load_data(cache_dir: str, ticker: str, interval: str = "day", count: int = None):
+    """(feats (N, 3) float32, close (N,) float64) - 저장소 피처 memmap 의 최근 count 개."""
+    feats, close = load_features(OHLCVStore(cache_dir), ticker, interval)
+    if count:
+        feats, close = feats[-count:], close[-count:]
+    if len(close) == 0:
+        hint = "run with --update" if interval == "day" else "run upbit_rl.data.backfill first"
+        raise RuntimeError(f"No {interval} bars for {ticker} in {cache_dir} ({hint})")
+    return feats, close
+
+def policy_targets(model_path: str, feats, window: int = 30, grid: int = 11, batch: int = 2048):
+    """모든 시점 t 의 window (앞쪽 0 패딩) x 포지션 grid 값 -> 목표 비중 (N, grid) float32.
+
+    포지션 열은 실제 bar 행에만 채운다 (패딩 행은 전부 0 이어야 Masking 됨).
+    """
+    agent = Agent(load_actor(model_path), explore=False)
+    pos = np.linspace(0.0, 1.0, grid, dtype=np.float32)
+    N, dim = feats.shape
+    padded = np.concatenate([np.zeros((window - 1, dim), dtype=np.float32), np.asarray(feats, dtype=np.float32)])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0).transpose(0, 2, 1)  # (N, window, dim) view
+    out = np.empty((N, grid), dtype=np.float32)
+    for i in range(0, N, batch):
+        j = min(i + batch, N)
+        x = np.empty((j - i, grid, window, dim + 1), dtype=np.float32)
+        x[..., :dim] = windows[i:j, None]
+        real = np.arange(window)[None, :] >= (window - 1 - np.arange(i, j))[:, None]   # (B, window)
+        x[..., dim] = real[:, None, :] * pos[None, :, None]
+        ab = agent.policy(x.reshape(-1, window, dim + 1))[0]
+        out[i:j] = agent.mean_targets(ab).reshape(j - i, grid)
+    return out
+
+def simulate(targets, close, thresh, fee: float = 0.0005, init_krw: float = 1_000_000, min_krw: float = MIN_KRW):
+    """목표 비중 표 (N, G) 로 thresh 값별 (C,) 포트폴리오 경로. 반환: equity (C, N), turnover (C,), trades (C,).
+
+    bar t 종가에 target(t) 로 리밸런스(|Δw| > thresh, 주문액 >= min_krw 일 때만), t+1 종가로 평가.
+    """
+    thresh = np.asarray(thresh, dtype=np.float64).reshape(-1)
+    C, (N, G) = len(thresh), targets.shape
+    grid = np.linspace(0.0, 1.0, G)
+    close = np.asarray(close, dtype=np.float64)
+    krw, qty = np.full(C, float(init_krw)), np.zeros(C)
+    equity = np.empty((C, N))
+    equity[:, 0] = krw
+    turnover, trades = np.zeros(C), np.zeros(C, dtype=np.int64)
+    for t in range(N - 1):
+        price = close[t]
+        total = krw + qty * price
+        w = np.zeros(C)
+        np.divide(qty * price, total, out=w, where=total > 0)
+        delta = np.interp(w, grid, targets[t]) - w
+        delta[(np.abs(delta) <= thresh) | (total * np.abs(delta) < min_krw)] = 0.0
+        krw, qty = fill(krw, qty, total, price, delta, fee)
+        turnover += np.abs(delta)
+        trades += delta != 0.0
+        equity[:, t + 1] = krw + qty * close[t + 1]
+    return equity, turnover, trades
+
+def metrics(equity, turnover, trades, interval: str = "day"):
+    """총수익, 연환산 Sharpe (log 수익), 최대 낙폭, 연환산 turnover (Σ|Δw| / 년), 거래 수."""
+    per_year = pd.Timedelta(days=365) / interval_delta(interval)
+    r = np.diff(np.log(np.maximum(equity, 1e-9)), axis=1)
+    sd = r.std(axis=1)
+    sharpe = np.where(sd > 0, r.mean(axis=1) / np.where(sd > 0, sd, 1.0) * np.sqrt(per_year), 0.0)
+    mdd = (1.0 - equity / np.maximum.accumulate(equity, axis=1)).max(axis=1)
+    years = max(equity.shape[1] - 1, 1) / per_year
+    return pd.DataFrame({
+        "return": equity[:, -1] / equity[:, 0] - 1.0,
+        "sharpe": sharpe,
+        "max_dd": mdd,
+        "turnover": turnover / years,
+        "trades": trades,
+    })
+
+def _evaluate(targets, close, thresh, cfg):
+    return metrics(*simulate(targets, close, thresh, cfg["fee"], cfg["init_krw"], cfg["min_krw"]), cfg["interval"])
+
+def portfolio_backtest(model_path: str, ohlcvs, thresh, cfg) -> pd.DataFrame:
+    """여러 티커: trade.py _rebalance_portfolio 와 같이 티커마다 자본 1/M 슬리브, 모델 1회 호출로 (M,) 목표 비중.
+
+    window 의 포지션 열은 실거래처럼 현재 슬리브 비중으로 채운다 (앞쪽 0 패딩 행은 0 -> Masking).
+    thresh 값마다 env 를 처음부터 재생. 반환: thresh 별 metrics 행.
+    """
+    agent = Agent(load_actor(model_path), explore=False)
+    env = PortfolioOHLCVEnv(ohlcvs, fee=cfg["fee"], init_krw=cfg["init_krw"], window=cfg["window"], trade_penalty=0.0)
+    W, dim, M, N = cfg["window"], len(FEATURES), env.M, env.N
+    padded = np.concatenate([np.zeros((W - 1, M, dim), dtype=np.float32), env.feats])
+    rows = []
+    for th in np.asarray(thresh, dtype=np.float64).reshape(-1):
+        obs = env.reset()
+        equity = np.empty((1, N))
+        equity[0, 0] = env.total
+        turnover, trades = 0.0, 0
+        x = np.empty((M, W, dim + 1), dtype=np.float32)
+        for t in range(N - 1):
+            curr_w = obs[:, -1].astype(np.float64)
+            x[..., :dim] = padded[t:t + W].transpose(1, 0, 2)
+            x[..., dim] = (np.arange(W) >= W - 1 - t)[None, :] * np.minimum(curr_w * M, 1.0)[:, None]
+            target = agent.act_batch(x) / M
+            delta = target - curr_w
+            keep = (np.abs(delta) <= th) | (env.total * np.abs(delta) < cfg["min_krw"])
+            target[keep] = curr_w[keep]
+            obs, _, _, info = env.step(target)
+            turnover += float(np.abs(delta[~keep]).sum())
+            trades += int((~keep).sum())
+            equity[0, t + 1] = info["total"]
+        rows.append(metrics(equity, np.array([turnover]), np.array([trades]), cfg["interval"]).assign(thresh=th))
+    df = pd.concat(rows, ignore_index=True)
+    df.insert(0, "thresh", df.pop("thresh"))
+    df.insert(0, "model", os.path.basename(model_path))
+    return df
+
+def run(models, thresh, feats, close, cfg, workers: int = 0) -> pd.DataFrame:
+    """체크포인트 x thresh 전체 평가. workers>0 이면 추론(체크포인트별)/시뮬레이션(thresh 묶음별)을 프로세스 풀로."""
+    feats, close = np.asarray(feats), np.asarray(close)  # memmap -> 배열 (워커로 pickle)
+    chunks = [c for c in np.array_split(np.asarray(thresh, dtype=np.float64), max(workers, 1)) if len(c)]
+    jobs = [(m, c) for m in range(len(models)) for c in chunks]
+    infer = [(m, feats, cfg["window"], cfg["grid"], cfg["batch"]) for m in models]
+    if workers > 0:
+        with mp.get_context("spawn").Pool(workers) as pool:
+            targets = pool.starmap(policy_targets, infer)
+            res = pool.starmap(_evaluate, [(targets[m], close, c, cfg) for m, c in jobs])
+    else:
+        targets = [policy_targets(*a) for a in infer]
+        res = [_evaluate(targets[m], close, c, cfg) for m, c in jobs]
+    for (m, c), df in zip(jobs, res):
+        df.insert(0, "thresh", c)
+        df.insert(0, "model", os.path.basename(models[m]))
+    return pd.concat(res, ignore_index=True)
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--ticker", default=os.getenv("TICKER", "KRW-BTC"))
+    p.add_argument("--tickers", default="", help="쉼표 구분 여러 티커 -> 포트폴리오(슬리브) 재생 (trade --tickers 와 같은 경로)")
+    p.add_argument("--models", default="models/actor_latest.keras", help="쉼표 구분 경로 또는 glob (예: 'models/ckpt/*.keras')")
+    p.add_argument("--thresh", default="0.05", help="쉼표 구분 리밸런스 임계값들")
+    p.add_argument("--interval", default="day")
+    p.add_argument("--count", type=int, default=None, help="최근 count 개 bar (기본: 저장분 전체)")
+    p.add_argument("--cache_dir", default="data/cache")
+    p.add_argument("--window", type=int, default=30)
+    p.add_argument("--grid", type=int, default=11, help="포지션 보간 grid 점 수")
+    p.add_argument("--batch", type=int, default=2048, help="추론 배치 (시점 수, x grid 개 시퀀스)")
+    p.add_argument("--fee", type=float, default=float(os.getenv("UPBIT_FEE", "0.0005")))
+    p.add_argument("--init_krw", type=float, default=1_000_000)
+    p.add_argument("--min_krw", type=float, default=MIN_KRW)
+    p.add_argument("--workers", type=int, default=0, help="프로세스 풀 크기 (0: 이 프로세스에서)")
+    p.add_argument("--update", action="store_true", help="day: 평가 전 pyupbit 로 저장소 갱신")
+    p.add_argument("--out", default=None, help="결과 CSV 경로")
+    args = p.parse_args()
+
+    models = sorted(m for pat in args.models.split(",") for m in glob.glob(pat.strip()))
+    if not models:
+        raise SystemExit(f"No models match {args.models}")
+    tickers = [t.strip() for t in args.tickers.split(",") if t.strip()]
+    if tickers and args.interval != "day":
+        raise SystemExit("--tickers: day interval only")
+    if args.update and args.interval == "day" and not tickers:
+        get_ohlcv(args.ticker, count=args.count or 400, cache_dir=args.cache_dir, force=True)
+    cfg = {k: getattr(args, k) for k in ("interval", "window", "grid", "batch", "fee", "init_krw", "min_krw")}
+    thresh = [float(x) for x in args.thresh.split(",")]
+    t0 = time.perf_counter()
+    if tickers:
+        ohlcvs = [get_ohlcv(t, count=args.count or 400, cache_dir=args.cache_dir, force=args.update) for t in tickers]
+        df = pd.concat([portfolio_backtest(m, ohlcvs, thresh, cfg) for m in models], ignore_index=True)
+        head = f"{','.join(tickers)} portfolio {args.interval} bars={len(align_ohlcv(ohlcvs)[0])}"
+    else:
+        feats, close = load_data(args.cache_dir, args.ticker, args.interval, args.count)
+        df = run(models, thresh, feats, close, cfg, args.workers)
+        head = f"{args.ticker} {args.interval} bars={len(close)} buy&hold={close[-1] / close[0] - 1:+.2%}"
+    sec = time.perf_counter() - t0
+    pd.set_option("display.width", 160)
+    print(head)
+    print(df.sort_values("sharpe", ascending=False).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"{len(models)} model(s) x {len(thresh)} thresh in {sec:.1f}s")
+    if args.out:
+        df.to_csv(args.out, index=False)
@@ -1,6 +1,8 @@
-import os, time
+import os, time, threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Dict, List, Tuple
+from .upbit_client import portfolio_summary
 
 FEE_RATE = float(os.getenv("UPBIT_FEE", "0.0005"))  # default 0.05%
 PAPER = os.getenv("PAPER_TRADE", "1") == "1"
@@ -18,47 +20,84 @@ class Broker:
         self.client = client
         self.paper = PAPER
         self.krw = None
-        self.coin = None
+        self.coins: Dict[str, float] = {}
         self.init_krw = init_krw or float(os.getenv("PAPER_INIT_KRW", "1000000"))
+        self.max_workers = int(os.getenv("ORDER_WORKERS", "4"))
+        self._lock = threading.Lock()  # 동시 주문 시 페이퍼 잔고 갱신 보호
 
     def _ensure_paper_state(self, ticker: str):
         if self.krw is None:
             self.krw = float(self.init_krw)
-            self.coin = 0.0
+        self.coins.setdefault(ticker, 0.0)
 
     def get_balance(self, ticker: str = "KRW-BTC"):
         if self.paper:
             self._ensure_paper_state(ticker)
             price = self.client.get_price(ticker)
+            coin = self.coins[ticker]
             return {
                 "krw": self.krw,
-                "coin_qty": self.coin,
-                "coin_value": self.coin * price,
-                "total_value": self.krw + self.coin * price,
+                "coin_qty": coin,
+                "coin_value": coin * price,
+                "total_value": self.krw + coin * price,
             }
         else:
             return self.client.get_balance(ticker)
 
-    def place_market_buy(self, ticker: str, krw_amount: float) -> OrderResult:
-        price = self.client.get_price(ticker)
+    def get_portfolio(self, tickers: Optional[List[str]] = None):
+        """여러 티커 잔고/현재가를 한 번에: {krw, qty, price, value (티커별 dict), total_value}.
+
+        실계좌는 get_balances 1회 + 현재가 1회 (tickers=None 이면 보유 중인 모든 마켓).
+        """
+        if self.paper:
+            if tickers is None:
+                tickers = [t for t, q in self.coins.items() if q > 0]
+            for t in tickers:
+                self._ensure_paper_state(t)
+            return portfolio_summary(self.krw, {t: self.coins[t] for t in tickers}, self.client.get_prices(tickers) if tickers else {})
+        return self.client.get_portfolio(tickers)
+
+    def place_market_buy(self, ticker: str, krw_amount: float, price: Optional[float] = None) -> OrderResult:
+        """price: 이미 조회한 현재가 (주면 다시 조회하지 않음, 체결 추정/페이퍼 체결에만 사용)."""
+        price = price or self.client.get_price(ticker)
         fee = krw_amount * FEE_RATE
         qty = (krw_amount - fee) / price
         if self.paper:
-            self._ensure_paper_state(ticker)
-            self.krw -= krw_amount
-            self.coin += qty
+            with self._lock:
+                self._ensure_paper_state(ticker)
+                self.krw -= krw_amount
+                self.coins[ticker] += qty
         else:
             self.client.market_buy(ticker, krw_amount)
         return OrderResult("buy", price, qty, fee, time.time())
 
-    def place_market_sell(self, ticker: str, qty: float) -> OrderResult:
-        price = self.client.get_price(ticker)
+    def place_market_sell(self, ticker: str, qty: float, price: Optional[float] = None) -> OrderResult:
+        price = price or self.client.get_price(ticker)
         proceeds = price * qty
         fee = proceeds * FEE_RATE
         if self.paper:
-            self._ensure_paper_state(ticker)
-            self.krw += proceeds - fee
-            self.coin -= qty
+            with self._lock:
+                self._ensure_paper_state(ticker)
+                self.krw += proceeds - fee
+                self.coins[ticker] -= qty
         else:
             self.client.market_sell(ticker, qty)
-        return OrderResult("sell", price, qty, fee, time.time())
\ No newline at end of file
+        return OrderResult("sell", price, qty, fee, time.time())
+
+    def submit_orders(self, orders: List[Tuple[str, str, float]], prices: Optional[Dict[str, float]] = None) -> List[OrderResult]:
+        """리밸런스 주문 묶음 [(ticker, "buy"|"sell", KRW 금액|수량)] 을 max_workers 스레드로 동시에 제출.
+
+        매도를 모두 끝낸 뒤 매수 (매도 대금으로 KRW 확보). 결과는 입력 순서, 실패한 주문은 예외 객체.
+        """
+        prices = prices or {}
+        results: List = [None] * len(orders)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as ex:
+            for side in ("sell", "buy"):
+                place = self.place_market_sell if side == "sell" else self.place_market_buy
+                futs = {i: ex.submit(place, t, amt, prices.get(t)) for i, (t, s, amt) in enumerate(orders) if s == side}
+                for i, f in futs.items():
+                    try:
+                        results[i] = f.result()
+                    except Exception as e:
+                        results[i] = e
+        return results
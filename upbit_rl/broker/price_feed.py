@@ -0,0 +1,106 @@
+import asyncio, json, threading, time, uuid
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+WS_URL = "wss://api.upbit.com/websocket/v1"
+
+class PriceFeed:
+    """Upbit WebSocket ticker 스트림 -> 메모리 최신가 테이블.
+
+    백그라운드 스레드의 asyncio 루프가 구독 마켓의 체결가를 받아 prices[code] = (수신 time.time(), price) 로 덮어쓴다.
+    읽기(get) 는 dict 조회뿐이라 네트워크 비용이 없다. 연결이 끊기면 자동 재연결 후 다시 구독한다.
+    """
+    def __init__(self, tickers: Iterable[str], url: str = WS_URL, ping_interval: float = 60.0):
+        if websockets is None:
+            raise RuntimeError("websockets not installed. pip install websockets")
+        self.url = url
+        self.ping_interval = ping_interval
+        self.codes = list(dict.fromkeys(tickers))
+        self.prices: Dict[str, Tuple[float, float]] = {}
+        self.messages = 0
+        self.reconnects = -1
+        self.connected = threading.Event()
+        self._stop = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws = None
+        self._thread = threading.Thread(target=self._run, name="upbit-price-feed", daemon=True)
+        self._thread.start()
+
+    def get(self, ticker: str, max_age: float) -> Optional[float]:
+        """max_age 초 안에 받은 가격, 없으면 None (호출자가 REST 로 대체)."""
+        hit = self.prices.get(ticker)
+        if hit is None or time.time() - hit[0] > max_age:
+            return None
+        return hit[1]
+
+    def age(self, ticker: str) -> float:
+        hit = self.prices.get(ticker)
+        return float("inf") if hit is None else time.time() - hit[0]
+
+    def wait(self, timeout: float = 5.0) -> bool:
+        """모든 구독 마켓의 첫 가격이 들어올 때까지 대기."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(c in self.prices for c in self.codes):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def subscribe(self, tickers: Iterable[str]):
+        """구독 마켓 추가 (연결 중이면 구독 요청을 다시 보낸다)."""
+        new = [t for t in tickers if t not in self.codes]
+        if not new:
+            return
+        self.codes += new
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.send(self._request()), self._loop)
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        self._thread.join(timeout)
+
+    def _request(self) -> str:
+        return json.dumps([{"ticket": uuid.uuid4().hex[:8]}, {"type": "ticker", "codes": list(self.codes)}, {"format": "DEFAULT"}])
+
+    def _on_message(self, raw):
+        data = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+        code = data.get("code") or data.get("cd")
+        price = data.get("trade_price", data.get("tp"))
+        if code is not None and price is not None:
+            self.prices[code] = (time.time(), float(price))
+            self.messages += 1
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        delay = 0.5
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url, ping_interval=self.ping_interval) as ws:
+                    self._ws = ws
+                    self.reconnects += 1
+                    await ws.send(self._request())
+                    self.connected.set()
+                    delay = 0.5
+                    async for raw in ws:
+                        self._on_message(raw)
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"[PriceFeed] disconnected: {e!r}, retry in {delay:.1f}s")
+            finally:
+                self._ws = None
+                self.connected.clear()
+            if not self._stop.is_set():
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
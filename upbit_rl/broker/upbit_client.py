@@ -1,53 +1,186 @@
-import os, time
-from typing import Optional, Dict
+import os, threading, time
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple
+import requests
+from .price_feed import PriceFeed, WS_URL
 
-try:
-    import pyupbit
-except ImportError:
-    pyupbit = None
+TICKER_URL = "https://api.upbit.com/v1/ticker"
+
+pyupbit = None  # 첫 인증 호출에서 import (pyupbit 는 pandas 까지 끌어와 시세 조회만 할 때는 불필요)
+_local = threading.local()
+
+def session(pool: int = 8) -> requests.Session:
+    """공개 시세 API 용 keep-alive Session (스레드마다 하나: requests.Session 은 스레드 안전하지 않음).
+
+    pyupbit 의 잔고/주문 요청은 건드리지 않는다 (모듈 전역 requests 를 바꾸면 주문 스레드들이 한 Session 을 공유).
+    """
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+    return s
+
+def _pyupbit():
+    """pyupbit 지연 import. 설치돼 있지 않으면 None."""
+    global pyupbit
+    if pyupbit is None:
+        try:
+            import pyupbit as mod
+        except ImportError:
+            return None
+        pyupbit = mod
+    return pyupbit
+
+def get_current_price(tickers: List[str], timeout: float = 5.0) -> Dict[str, float]:
+    """공개 시세 API 1회로 여러 마켓 현재가 {ticker: trade_price}. 요청/응답이 잘못되면 RuntimeError (응답에 없는 마켓은 None)."""
+    try:
+        r = session().get(TICKER_URL, params={"markets": ",".join(tickers)}, timeout=timeout)
+        r.raise_for_status()
+        prices = {x["market"]: float(x["trade_price"]) for x in r.json()}
+    except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+        raise RuntimeError(f"Failed to fetch price for {','.join(tickers)}: {e}") from e
+    return {t: prices.get(t) for t in tickers}
+
+def summarize_timings(timings: List[Tuple[str, float]]) -> Dict[str, Tuple[int, float]]:
+    """[(이름, 초)] -> {이름: (호출 수, 합계 초)}."""
+    out: Dict[str, Tuple[int, float]] = {}
+    for name, sec in timings:
+        n, tot = out.get(name, (0, 0.0))
+        out[name] = (n + 1, tot + sec)
+    return out
+
+def portfolio_summary(krw: float, qty: Dict[str, float], price: Dict[str, float]):
+    value = {t: qty[t] * price[t] for t in qty}
+    return {"krw": krw, "qty": qty, "price": price, "value": value, "total_value": krw + sum(value.values())}
 
 class UpbitClient:
-    """Thin wrapper around pyupbit for price, balance, and market orders."""
-    def __init__(self, access: Optional[str]=None, secret: Optional[str]=None):
+    """Thin wrapper around pyupbit for price, balance, and market orders.
+
+    subscribe(tickers) 로 WebSocket 가격 피드를 켜면 get_price 는 메모리 테이블 조회로 끝나고,
+    피드 가격이 max_age 보다 오래됐거나 없으면 REST 로 대체한다.
+    """
+    def __init__(self, access: Optional[str]=None, secret: Optional[str]=None, max_age: Optional[float]=None, feed: Optional[PriceFeed]=None):
         access = access or os.getenv("UPBIT_ACCESS")
         secret = secret or os.getenv("UPBIT_SECRET")
         self.ticker_price_cache: Dict[str, tuple[float, float]] = {}
-        self.upbit = None
-        if pyupbit and access and secret:
-            self.upbit = pyupbit.Upbit(access, secret)
+        # 가격 허용 나이(초): WebSocket 피드/REST 캐시 공통. 넘으면 REST 로 다시 받는다.
+        self.max_age = float(os.getenv("PRICE_MAX_AGE_SEC", "5")) if max_age is None else float(max_age)
+        self.feed = feed
+        self.timings: List[Tuple[str, float]] = []  # 거래소 호출별 (이름, 초) - reset_timings() 로 비움
+        self._keys = (access, secret)
+        self._upbit = None
+
+    @property
+    def upbit(self):
+        """인증 클라이언트 (pyupbit.Upbit). 키가 없거나 pyupbit 가 없으면 None. 첫 사용 시 생성."""
+        if self._upbit is None and all(self._keys) and _pyupbit() is not None:
+            self._upbit = pyupbit.Upbit(*self._keys)
+        return self._upbit
+
+    @upbit.setter
+    def upbit(self, value):
+        self._upbit = value
+
+    @contextmanager
+    def timed(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((name, time.perf_counter() - t0))
+
+    def reset_timings(self) -> List[Tuple[str, float]]:
+        out, self.timings = self.timings, []
+        return out
+
+    def subscribe(self, tickers: List[str], url: str = WS_URL, wait: float = 5.0):
+        """WebSocket ticker 피드 시작(또는 마켓 추가). 이후 get_price/get_prices 는 피드 테이블에서 읽는다."""
+        if self.feed is None:
+            self.feed = PriceFeed(tickers, url=url)
+        else:
+            self.feed.subscribe(tickers)
+        if wait:
+            self.feed.wait(wait)
+        return self.feed
+
+    def close(self):
+        if self.feed is not None:
+            self.feed.close()
+            self.feed = None
+
+    def _cached_price(self, ticker: str, now: float) -> Optional[float]:
+        """피드 -> REST 캐시 순으로 max_age 안의 가격. 없으면 None."""
+        if self.feed is not None:
+            price = self.feed.get(ticker, self.max_age)
+            if price is not None:
+                return price
+        hit = self.ticker_price_cache.get(ticker)
+        if hit is not None and now - hit[0] < self.max_age:
+            return float(hit[1])
+        return None
 
     def get_price(self, ticker: str = "KRW-BTC") -> float:
         now = time.time()
-        if ticker in self.ticker_price_cache and now - self.ticker_price_cache[ticker][0] < 5:
-            return float(self.ticker_price_cache[ticker][1])
-        if not pyupbit:
-            raise RuntimeError("pyupbit not installed. pip install pyupbit")
-        price = pyupbit.get_current_price(ticker)
+        price = self._cached_price(ticker, now)
+        if price is not None:
+            return price
+        with self.timed("get_current_price"):
+            price = get_current_price([ticker]).get(ticker)
         if price is None:
             raise RuntimeError(f"Failed to fetch price for {ticker}")
-        self.ticker_price_cache[ticker] = (now, float(price))
-        return float(price)
+        self.ticker_price_cache[ticker] = (now, price)
+        return price
 
-    def get_balance(self, ticker: str = "KRW-BTC"):
+    def get_prices(self, tickers: List[str]) -> Dict[str, float]:
+        """여러 티커 현재가: 피드/캐시에 없는 (또는 오래된) 티커만 한 번의 REST 요청으로."""
+        now = time.time()
+        out = {t: self._cached_price(t, now) for t in tickers}
+        missing = [t for t, p in out.items() if p is None]
+        if missing:
+            with self.timed("get_current_price"):
+                prices = get_current_price(missing)
+            for t in missing:
+                if prices.get(t) is None:
+                    raise RuntimeError(f"Failed to fetch price for {t}")
+                self.ticker_price_cache[t] = (now, prices[t])
+                out[t] = prices[t]
+        return out
+
+    def balances(self) -> Dict[str, float]:
+        """전체 계좌 잔고 {통화: 수량} - get_balances 1회."""
         if not self.upbit:
             raise RuntimeError("Real balance requires UPBIT_ACCESS/UPBIT_SECRET and pyupbit.")
-        krw = float(self.upbit.get_balance("KRW") or 0)
-        coin = ticker.split("-")[1]
-        qty = float(self.upbit.get_balance(coin) or 0)
-        price = self.get_price(ticker)
+        with self.timed("get_balances"):
+            rows = self.upbit.get_balances()
+        return {b["currency"]: float(b["balance"] or 0) for b in rows if b["unit_currency"] == "KRW"}
+
+    def get_portfolio(self, tickers: Optional[List[str]] = None):
+        """전체 잔고 1회(get_balances) + 현재가 1회로 여러 티커 평가. tickers=None 이면 보유 중인 모든 마켓."""
+        balances = self.balances()
+        if tickers is None:
+            tickers = [f"KRW-{c}" for c, q in balances.items() if c != "KRW" and q > 0]
+        qty = {t: balances.get(t.split("-")[1], 0.0) for t in tickers}
+        return portfolio_summary(balances.get("KRW", 0.0), qty, self.get_prices(tickers) if tickers else {})
+
+    def get_balance(self, ticker: str = "KRW-BTC"):
+        pf = self.get_portfolio([ticker])
         return {
-            "krw": krw,
-            "coin_qty": qty,
-            "coin_value": qty * price,
-            "total_value": krw + qty * price,
+            "krw": pf["krw"],
+            "coin_qty": pf["qty"][ticker],
+            "coin_value": pf["value"][ticker],
+            "total_value": pf["total_value"],
         }
 
     def market_buy(self, ticker: str, krw_amount: float):
         if not self.upbit:
             raise RuntimeError("market_buy requires UPBIT_ACCESS/UPBIT_SECRET.")
-        return self.upbit.buy_market_order(ticker, krw_amount)
+        with self.timed("buy_market_order"):
+            return self.upbit.buy_market_order(ticker, krw_amount)
 
     def market_sell(self, ticker: str, qty: float):
         if not self.upbit:
             raise RuntimeError("market_sell requires UPBIT_ACCESS/UPBIT_SECRET.")
-        return self.upbit.sell_market_order(ticker, qty)
\ No newline at end of file
+        with self.timed("sell_market_order"):
+            return self.upbit.sell_market_order(ticker, qty)
@@ -0,0 +1,106 @@
+# upbit_rl/daemon.py
+"""상주 트레이딩 서비스: 모델/클라이언트를 한 번 올려 두고 bar 마감마다 리밸런스.
+
+bar 마감(KST, day 는 09:00) 직후 tick -> 저장소 증분 갱신(방금 마감된 bar 가 보일 때까지 settle 초 간격 재시도)
+-> 추론 -> 주문. 지연은 bar 마감 시각부터 주문 제출까지 재서 state 파일(최근 100개)과 로그에 남긴다.
+쿨다운/페이퍼 잔고/마지막 처리 bar 는 state 파일에 있어 재시작해도 같은 bar 를 두 번 거래하지 않는다.
+
+python -m upbit_rl.daemon --ticker KRW-BTC --interval minute60
+"""
+import argparse, signal, threading, time
+import numpy as np
+import pandas as pd
+from .data.store import interval_delta
+from .trade import Trader, add_args, notifier, STATE_PATH
+
+KST = pd.Timedelta(hours=9)
+DAY_OPEN = pd.Timedelta(hours=9)  # Upbit 일봉은 09:00 KST 에 열림
+
+def now_kst() -> pd.Timestamp:
+    return pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None)
+
+def next_close(now: pd.Timestamp, interval: str) -> pd.Timestamp:
+    """now 이후 첫 bar 마감 시각 (KST, naive)."""
+    if interval == "day":
+        close = now.normalize() + DAY_OPEN
+        return close if close > now else close + pd.Timedelta(days=1)
+    if interval.startswith("minute"):
+        # 분봉 경계는 UTC 기준 (minute240 은 01/05/09/... KST) -> UTC 로 내려서 자르고 다시 KST 로
+        delta = interval_delta(interval)
+        return (now - KST).floor(delta) + delta + KST
+    raise ValueError(f"daemon supports day / minuteN bars, got {interval}")
+
+def epoch(ts_kst: pd.Timestamp) -> float:
+    return (ts_kst - KST).tz_localize("UTC").timestamp()
+
+class Daemon:
+    def __init__(self, trader: Trader, interval: str, settle: float = 2.0, retries: int = 5):
+        self.trader = trader
+        self.interval = interval
+        self.settle = float(settle)
+        self.retries = int(retries)
+        self.stop = threading.Event()
+
+    def tick(self, close: pd.Timestamp) -> dict:
+        """close 에 마감된 bar 로 리밸런스. 거래소 반영이 늦으면 settle 간격으로 다시 받는다."""
+        want = close - interval_delta(self.interval)  # 방금 마감된 bar 의 시작 시각 (= 저장소 인덱스)
+        t0 = time.perf_counter()
+        pending = list(self.trader.tickers)
+        for _ in range(self.retries):
+            pending = [t for t in pending if self.trader.ohlcv(t, close)["date"].iloc[-1] < want]
+            if not pending or self.stop.wait(self.settle):
+                break
+        if pending:
+            print(f"[daemon] bar {want} not yet available for {pending}, using latest stored bars")
+        poll = time.perf_counter() - t0
+        timing = self.trader.rebalance(bar_close=close, refresh=False)  # 방금 갱신한 저장소 그대로
+        timing["fetch"] += poll
+        done = time.time()
+        timing["latency"] = (timing["submitted"] or done) - epoch(close)
+        lat = self.trader.state.setdefault("latency", [])
+        lat.append({"bar": str(close), "sec": round(timing["latency"], 3), "traded": timing["submitted"] is not None})
+        del lat[:-100]
+        self.trader.save()
+        return timing
+
+    def run(self):
+        last = self.trader.state.get("last_bar")
+        while not self.stop.is_set():
+            close = next_close(now_kst(), self.interval)
+            # 재시작 직후: 마지막 처리 bar 이후 마감된 bar 가 있으면 바로 처리 (같은 bar 는 건너뜀)
+            prev = close - interval_delta(self.interval)
+            if last is not None and pd.Timestamp(last) < prev:
+                close = prev
+            else:
+                wait = epoch(close) + 0.05 - time.time()
+                print(f"[daemon] next bar close {close} (in {wait:.0f}s)")
+                if self.stop.wait(max(wait, 0.0)):
+                    break
+            try:
+                t = self.tick(close)
+                lat = np.array([x["sec"] for x in self.trader.state["latency"]])
+                print(f"[daemon] bar {close} close->{'order' if t['submitted'] else 'decision'} {t['latency']:.2f}s "
+                      f"(fetch {t['fetch']:.2f}s infer {t['infer'] * 1e3:.0f}ms order {t['order']:.2f}s, "
+                      f"{sum(n for n, _ in t['exchange'].values())} exchange calls) "
+                      f"p50 {np.median(lat):.2f}s over {len(lat)} ticks")
+            except Exception as e:
+                # 일시적인 API 오류로 서비스가 죽지 않게: 알리고 다음 bar 로
+                print(f"[daemon] tick {close} failed: {e}")
+                notifier.send(f":warning: daemon tick {close} failed: {e}")
+            last = str(close)
+
+if __name__ == "__main__":
+    p = add_args(argparse.ArgumentParser())
+    p.add_argument("--state", default=STATE_PATH, help="쿨다운/페이퍼 잔고/지연 기록 파일")
+    p.add_argument("--settle", type=float, default=2.0, help="마감된 bar 가 아직 안 보일 때 재시도 간격(초)")
+    args = p.parse_args()
+
+    daemon = Daemon(Trader(args, state_path=args.state), args.interval, settle=args.settle)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: daemon.stop.set())
+    notifier.send(f":rocket: daemon started {','.join(daemon.trader.tickers)} {args.interval}")
+    daemon.run()
+    daemon.trader.save()
+    daemon.trader.client.close()
+    notifier.close()
+    print("[daemon] stopped")
@@ -0,0 +1,175 @@
+import argparse, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import pandas as pd
+import requests
+from .store import OHLCVStore
+
+PAGE = 200  # Upbit candles API 1회 최대 행 수
+KST = pd.Timedelta(hours=9)
+
+def candles_path(interval: str) -> str:
+    if interval.startswith("minute"):
+        return f"/v1/candles/minutes/{int(interval[len('minute'):])}"
+    if interval in ("day", "week", "month"):
+        return f"/v1/candles/{interval}s"
+    raise ValueError(f"Unknown interval: {interval}")
+
+class TokenBucket:
+    """스레드 공유 토큰 버킷: 초당 rate 개, 최대 burst 개까지 몰아서 허용."""
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.ts = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self) -> float:
+        """토큰 1개 소비 시도. 성공하면 0, 아니면 기다려야 할 초."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+            self.ts = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        return self._take() == 0.0
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    def pause(self, sec: float):
+        """서버 제한 신호(429 등): 버킷을 음수로 만들어 모든 스레드가 sec 동안 대기."""
+        with self.lock:
+            self.tokens = min(self.tokens, 0.0) - sec * self.rate
+
+class Backfiller:
+    """Upbit candles REST 를 페이지 단위(200행)로 거슬러 받아 OHLCVStore 에 저장.
+
+    티커별로 스레드 풀에서 동시에 진행하고, 모든 요청은 공유 TokenBucket 을 거친다.
+    429/418/5xx/연결 오류는 Retry-After (없으면 지수 backoff) 후 재시도.
+    """
+    def __init__(self, store: OHLCVStore, base_url: str = "https://api.upbit.com", rate: float = 8.0,
+                 workers: int = 4, retries: int = 5, backoff: float = 0.5, timeout: float = 10.0):
+        self.store = store
+        self.base_url = base_url.rstrip("/")
+        self.bucket = TokenBucket(rate)
+        self.workers = int(workers)
+        self.retries = int(retries)
+        self.backoff = float(backoff)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """워커 스레드마다 keep-alive Session 하나 (requests.Session 은 스레드 안전하지 않음)."""
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = self._local.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+        return s
+
+    def _get(self, path: str, params: dict) -> list:
+        err = None
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            delay = self.backoff * (2 ** attempt)
+            try:
+                resp = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                err = e
+            else:
+                if resp.status_code == 200:
+                    return resp.json()
+                if resp.status_code not in (418, 429) and resp.status_code < 500:
+                    resp.raise_for_status()
+                err = f"HTTP {resp.status_code}"
+                if "Retry-After" in resp.headers:
+                    delay = float(resp.headers["Retry-After"])
+                if resp.status_code in (418, 429):
+                    self.bucket.pause(delay)  # 공유 버킷: 다른 티커 스레드도 같이 늦춘다
+                    continue
+            time.sleep(delay)
+        raise RuntimeError(f"GET {path} {params} failed after {self.retries} retries: {err}")
+
+    def fetch_page(self, ticker: str, interval: str, to: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """to(KST, exclusive) 이전 최대 200개 bar. 시간 오름차순 DataFrame (DatetimeIndex KST)."""
+        params = {"market": ticker, "count": PAGE}
+        if to is not None:
+            params["to"] = (to - KST).strftime("%Y-%m-%d %H:%M:%S")  # API 의 to 는 UTC
+        rows = self._get(candles_path(interval), params)
+        df = pd.DataFrame({
+            "open": [r["opening_price"] for r in rows],
+            "high": [r["high_price"] for r in rows],
+            "low": [r["low_price"] for r in rows],
+            "close": [r["trade_price"] for r in rows],
+            "volume": [r["candle_acc_trade_volume"] for r in rows],
+            "value": [r["candle_acc_trade_price"] for r in rows],
+        }, index=pd.to_datetime([r["candle_date_time_kst"] for r in rows]), dtype=float)
+        return df.sort_index()
+
+    def _pages(self, ticker: str, interval: str, to: Optional[pd.Timestamp], stop: pd.Timestamp) -> pd.DataFrame:
+        """to 부터 과거로 페이지를 넘기며 stop 시각(포함)까지."""
+        frames = []
+        while True:
+            df = self.fetch_page(ticker, interval, to)
+            if df.empty:
+                break
+            frames.append(df[df.index >= stop])
+            if df.index[0] <= stop or len(df) < PAGE:
+                break
+            to = df.index[0]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames).sort_index()
+        return df[~df.index.duplicated(keep="last")]
+
+    def backfill(self, ticker: str, interval: str, since) -> int:
+        """[since, 현재] 중 저장소에 없는 구간만 받아 저장. 반환: 받은 행 수."""
+        since = pd.Timestamp(since)
+        a = self.store.arrays(ticker, interval)
+        rows = 0
+        segments = [(None, since)]
+        if len(a["ts"]):
+            first, last = pd.Timestamp(int(a["ts"][0])), pd.Timestamp(int(a["ts"][-1]))
+            segments = [(None, last)] + ([(first, since)] if since < first else [])
+            del a
+        for to, stop in segments:
+            df = self._pages(ticker, interval, to, stop)
+            if not df.empty:
+                self.store.append(ticker, interval, df)
+                rows += len(df)
+        return rows
+
+    def run(self, tickers: List[str], interval: str, since) -> Dict[str, int]:
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            futs = {t: ex.submit(self.backfill, t, interval, since) for t in tickers}
+            return {t: f.result() for t, f in futs.items()}
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", default=os.getenv("TICKERS", "KRW-BTC"), help="쉼표 구분")
+    p.add_argument("--interval", default="minute1")
+    p.add_argument("--since", required=True, help="KST 시각, 예: 2024-01-01")
+    p.add_argument("--cache_dir", default="data/cache")
+    p.add_argument("--base_url", default="https://api.upbit.com")
+    p.add_argument("--rate", type=float, default=8.0, help="초당 요청 수 (전체 공유)")
+    p.add_argument("--workers", type=int, default=4)
+    args = p.parse_args()
+
+    bf = Backfiller(OHLCVStore(args.cache_dir), base_url=args.base_url, rate=args.rate, workers=args.workers)
+    t0 = time.perf_counter()
+    rows = bf.run([t.strip() for t in args.tickers.split(",") if t.strip()], args.interval, args.since)
+    sec = time.perf_counter() - t0
+    for t, n in rows.items():
+        print(f"{t}: {n} rows")
+    print(f"total {sum(rows.values())} rows in {sec:.1f}s ({sum(rows.values()) / sec:,.0f} rows/s)")
@@ -0,0 +1,131 @@
+import os, pathlib
+import numpy as np
+import pandas as pd
+from typing import Optional, Dict
+
+COLUMNS = ["open", "high", "low", "close", "volume", "value"]
+_DELTAS = {"day": pd.Timedelta(days=1), "week": pd.Timedelta(weeks=1), "month": pd.Timedelta(days=31)}
+
+def interval_delta(interval: str) -> pd.Timedelta:
+    if interval in _DELTAS:
+        return _DELTAS[interval]
+    if interval.startswith("minute"):
+        return pd.Timedelta(minutes=int(interval[len("minute"):]))
+    raise ValueError(f"Unknown interval: {interval}")
+
+def _map(f: pathlib.Path, dtype: str) -> np.ndarray:
+    if not f.exists() or f.stat().st_size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(f, dtype=dtype, mode="r")
+
+def _read(f: pathlib.Path, dtype: str) -> np.ndarray:
+    # 쓰기 경로는 memmap 대신 복사본 (열린 매핑이 있으면 Windows 에서 truncate 불가)
+    return np.fromfile(f, dtype=dtype) if f.exists() else np.empty(0, dtype=dtype)
+
+def _ts(df: pd.DataFrame) -> np.ndarray:
+    idx = df["date"] if "date" in df.columns else df.index
+    return pd.to_datetime(idx).to_numpy("datetime64[ns]").astype("<i8")
+
+class OHLCVStore:
+    """티커/interval 별 컬럼 바이너리 OHLCV 저장소 (append-only 파일 + memmap 읽기).
+
+    {root}/{TICKER}/{interval}/ts.i8 (int64 ns), open.f8 ... value.f8 (float64).
+    행 수는 ts 길이가 기준이라 쓰기 도중 중단돼도 다음 append 에서 잘라 맞춘다.
+    """
+    def __init__(self, root: str = "data/cache"):
+        self.root = pathlib.Path(root)
+
+    def path(self, ticker: str, interval: str = "day") -> pathlib.Path:
+        return self.root / ticker.replace("-", "_") / interval
+
+    def arrays(self, ticker: str, interval: str = "day") -> Dict[str, np.ndarray]:
+        """zero-copy memmap 컬럼 {"ts": int64 ns, open ... value: float64}."""
+        d = self.path(ticker, interval)
+        ts = _map(d / "ts.i8", "<i8")
+        out = {"ts": ts}
+        for c in COLUMNS:
+            out[c] = _map(d / f"{c}.f8", "<f8")[:len(ts)]
+        return out
+
+    def size(self, ticker: str, interval: str = "day") -> int:
+        f = self.path(ticker, interval) / "ts.i8"
+        return f.stat().st_size // 8 if f.exists() else 0
+
+    def last_ts(self, ticker: str, interval: str = "day") -> Optional[pd.Timestamp]:
+        ts = self.arrays(ticker, interval)["ts"]
+        return pd.Timestamp(int(ts[-1])) if len(ts) else None
+
+    def load(self, ticker: str, interval: str = "day", start=None, end=None, count: Optional[int] = None) -> pd.DataFrame:
+        """[start, end] 구간 (또는 최근 count 개) 을 'date' + OHLCV 컬럼 DataFrame 으로."""
+        a = self.arrays(ticker, interval)
+        lo, hi = 0, len(a["ts"])
+        if start is not None:
+            lo = int(np.searchsorted(a["ts"], pd.Timestamp(start).value, "left"))
+        if end is not None:
+            hi = int(np.searchsorted(a["ts"], pd.Timestamp(end).value, "right"))
+        if count is not None:
+            lo = max(lo, hi - int(count))
+        cols = {"date": np.array(a["ts"][lo:hi]).view("datetime64[ns]")}
+        cols.update((c, np.array(a[c][lo:hi])) for c in COLUMNS)
+        return pd.DataFrame(cols, copy=False)
+
+    def append(self, ticker: str, interval: str, df: pd.DataFrame) -> int:
+        """OHLCV(DatetimeIndex 또는 'date' 컬럼) 저장. 반환: 새로 늘어난 행 수.
+
+        마지막 저장 시각 이후 행만 파일 끝에 붙이고, 같은 시각의 마지막 bar 는 덮어쓴다 (진행 중 bar 갱신).
+        그보다 과거 행이 새로 들어오면 병합 후 전체를 다시 쓴다.
+        """
+        ts = _ts(df)
+        order = np.argsort(ts, kind="stable")
+        ts, df = ts[order], df.iloc[order]
+        d = self.path(ticker, interval)
+        d.mkdir(parents=True, exist_ok=True)
+        cur_ts = _read(d / "ts.i8", "<i8")
+        n = len(cur_ts)
+        if n and len(ts) and ts[0] < cur_ts[-1] and not np.isin(ts[ts < cur_ts[-1]], cur_ts).all():
+            return self._rewrite(d, cur_ts, ts, df)
+        keep = ts >= cur_ts[-1] if n else np.ones(len(ts), dtype=bool)
+        if n and keep.any() and ts[keep][0] == cur_ts[-1]:
+            n -= 1
+        self._truncate(d, n)
+        self._write(d, ts[keep], df[keep], mode="ab")
+        return n + int(keep.sum()) - len(cur_ts)
+
+    def update(self, ticker: str, interval: str = "day", count: int = 200) -> int:
+        """pyupbit 로 마지막 저장 시각 이후 bar 만 받아 append. 저장분이 count 보다 적으면 count 개를 받는다."""
+        last = self.last_ts(ticker, interval)
+        if last is None or self.size(ticker, interval) < count:
+            n = count
+        else:
+            now = pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None)  # pyupbit 인덱스는 KST
+            n = int((now - last) / interval_delta(interval)) + 2
+        import pyupbit
+        df = pyupbit.get_ohlcv(ticker, interval=interval, count=n)
+        if df is None or df.empty:
+            raise RuntimeError("Failed to fetch OHLCV")
+        return self.append(ticker, interval, df)
+
+    def _rewrite(self, d, cur_ts, ts, df) -> int:
+        old = pd.DataFrame({c: _read(d / f"{c}.f8", "<f8")[:len(cur_ts)] for c in COLUMNS}, index=cur_ts)
+        new = pd.DataFrame({c: (df[c].to_numpy(np.float64) if c in df.columns else np.nan) for c in COLUMNS}, index=ts)
+        merged = pd.concat([old, new])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self._write(d, merged.index.to_numpy(), merged, mode="wb")
+        return len(merged) - len(old)
+
+    @staticmethod
+    def _truncate(d: pathlib.Path, n: int):
+        for name in ["ts.i8"] + [f"{c}.f8" for c in COLUMNS]:
+            f = d / name
+            if f.exists() and f.stat().st_size > n * 8:
+                os.truncate(f, n * 8)
+
+    @staticmethod
+    def _write(d: pathlib.Path, ts: np.ndarray, df: pd.DataFrame, mode: str):
+        # 컬럼 먼저, ts 마지막: ts 길이가 커밋된 행 수
+        for c in COLUMNS:
+            col = df[c].to_numpy(np.float64) if c in df.columns else np.full(len(ts), np.nan)
+            with open(d / f"{c}.f8", mode) as f:
+                col.astype("<f8").tofile(f)
+        with open(d / "ts.i8", mode) as f:
+            np.asarray(ts, dtype="<i8").tofile(f)
@@ -1,51 +1,159 @@
-import os, json, requests, time
+import os, json, requests, time, threading, queue, atexit
 from typing import Optional, List, Dict, Any
 
+_NONE = object()  # 워커가 다음 배치로 넘길 메시지 없음 (None 은 종료 신호)
+
 class SlackNotifier:
-    """Send Slack messages via Incoming Webhook or Bot Token (chat.postMessage)."""
-    def __init__(self, webhook_url: Optional[str]=None, bot_token: Optional[str]=None, channel: Optional[str]=None, timeout: int=10):
+    """Send Slack messages via Incoming Webhook or Bot Token (chat.postMessage).
+
+    background=True (or SLACK_ASYNC=1): send() only enqueues into a bounded queue and returns at once.
+    A worker thread drains it over a pooled requests.Session, coalescing bursts of text messages
+    into one post, retrying with Retry-After / backoff. flush() waits for delivery; close() (also at exit) flushes and stops.
+    """
+    def __init__(self, webhook_url: Optional[str]=None, bot_token: Optional[str]=None, channel: Optional[str]=None, timeout: int=10,
+                 background: Optional[bool]=None, max_queue: int=1000, linger: float=0.2, max_chars: int=3000, retries: int=3,
+                 api_url: str="https://slack.com/api/chat.postMessage"):
         self.webhook_url = webhook_url or os.getenv("SLACK_WEBHOOK_URL")
         self.bot_token = bot_token or os.getenv("SLACK_BOT_TOKEN")
         self.channel = channel or os.getenv("SLACK_CHANNEL")
         self.timeout = timeout
+        self.api_url = api_url
+        self.retries = int(retries)
+        self.linger = float(linger)
+        self.max_chars = int(max_chars)
+        self.session = requests.Session()  # keep-alive: 메시지마다 새 TLS 연결을 열지 않음
+        self.dropped = 0
+        self.background = os.getenv("SLACK_ASYNC", "0") == "1" if background is None else bool(background)
+        self._worker = None
+        if self.background:
+            self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+            self._pending = 0
+            self._cond = threading.Condition()
+            self._worker = threading.Thread(target=self._run, name="slack-notifier", daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
 
     def send(self, text: str, blocks: Optional[List[Dict[str, Any]]]=None) -> bool:
-        if self.bot_token:
-            return self._send_web_api(text, blocks)
-        if self.webhook_url:
-            return self._send_webhook(text, blocks)
-        print("[SlackNotifier] No webhook_url or bot_token set.")
+        if not (self.bot_token or self.webhook_url):
+            print("[SlackNotifier] No webhook_url or bot_token set.")
+            return False
+        if self._worker is None:
+            return self._deliver(text, blocks)
+        with self._cond:
+            self._pending += 1
+        self._put((text, blocks))
+        return True
+
+    def _put(self, item):
+        """막지 않고 넣기: 가득 차면 가장 오래된 메시지를 버린다 (최신 상태가 더 중요)."""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    old = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if old is not None:
+                    self.dropped += 1
+                    self._done(1)
+
+    def flush(self, timeout: Optional[float]=None) -> bool:
+        """큐에 쌓인 메시지가 모두 전송(또는 포기)될 때까지 대기. 시간 내에 비면 True."""
+        if self._worker is None:
+            return True
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float]=10.0):
+        if self._worker is None:
+            return
+        self.flush(timeout)
+        self._put(None)  # 전송이 밀려 큐가 차 있어도 종료 신호는 막지 않고 넣는다
+        self._worker.join(timeout)
+        self._worker = None
+        self.session.close()
+
+    def _done(self, n: int):
+        with self._cond:
+            self._pending -= n
+            self._cond.notify_all()
+
+    def _run(self):
+        carry = _NONE
+        while True:
+            item = self._queue.get() if carry is _NONE else carry
+            carry = _NONE
+            if item is None:
+                return
+            # 텍스트 메시지 burst 는 linger 동안 모아 한 번에 (blocks 가 있는 메시지는 단독 전송)
+            texts, n, size = [item[0]], 1, len(item[0])
+            deadline = time.monotonic() + self.linger
+            while item[1] is None:
+                try:
+                    nxt = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    break
+                # size = len("\n".join(texts)): 합친 뒤 실제 길이로 max_chars 확인
+                if nxt is None or nxt[1] is not None or size + 1 + len(nxt[0]) > self.max_chars:
+                    carry = nxt
+                    break
+                texts.append(nxt[0]); n += 1; size += 1 + len(nxt[0])
+            try:
+                self._deliver("\n".join(texts), item[1])
+            finally:
+                self._done(n)
+
+    def _deliver(self, text: str, blocks: Optional[List[Dict[str, Any]]]) -> bool:
+        for attempt in range(self.retries + 1):
+            ok, wait = self._send_web_api(text, blocks) if self.bot_token else self._send_webhook(text, blocks)
+            if ok or wait is None or attempt == self.retries:
+                return ok
+            time.sleep(wait if wait > 0 else 0.5 * 2 ** attempt)
         return False
 
+    @staticmethod
+    def _retry_after(resp) -> Optional[float]:
+        """재시도할 대기 시간(초): 429 는 Retry-After, 5xx 는 0 (backoff). 재시도 불가면 None."""
+        if resp.status_code == 429:
+            return float(resp.headers.get("Retry-After", 1))
+        return 0.0 if resp.status_code >= 500 else None
+
     def _send_webhook(self, text: str, blocks: Optional[List[Dict[str, Any]]]):
         payload: Dict[str, Any] = {"text": text}
         if blocks: payload["blocks"] = blocks
         try:
-            resp = requests.post(self.webhook_url, json=payload, timeout=self.timeout)
+            resp = self.session.post(self.webhook_url, json=payload, timeout=self.timeout)
             if resp.status_code == 200:
-                return True
+                return True, None
             print(f"[SlackNotifier] Webhook failed: {resp.status_code} {resp.text}")
+            return False, self._retry_after(resp)
         except Exception as e:
             print(f"[SlackNotifier] Webhook error: {e}")
-        return False
+            return False, 0.0
 
     def _send_web_api(self, text: str, blocks: Optional[List[Dict[str, Any]]]):
         if not self.channel:
             print("[SlackNotifier] channel is required for Web API.")
-            return False
+            return False, None
         headers = {"Authorization": f"Bearer {self.bot_token}", "Content-Type": "application/json; charset=utf-8"}
         payload: Dict[str, Any] = {"channel": self.channel, "text": text}
         if blocks: payload["blocks"] = blocks
         try:
-            resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload, timeout=self.timeout)
+            resp = self.session.post(self.api_url, headers=headers, json=payload, timeout=self.timeout)
+            if resp.status_code != 200:
+                print(f"[SlackNotifier] Web API failed: {resp.status_code}")
+                return False, self._retry_after(resp)
             data = resp.json()
             if data.get("ok"):
-                return True
+                return True, None
             print(f"[SlackNotifier] Web API failed: {data}")
+            return False, (float(resp.headers.get("Retry-After", 1)) if data.get("error") == "ratelimited" else None)
         except Exception as e:
             print(f"[SlackNotifier] Web API error: {e}")
-        return False
+            return False, 0.0
 
     def heartbeat(self, service_name: str="upbit-rl"):
         ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        return self.send(f":heartbeat: {service_name} alive @ {ts}")
\ No newline at end of file
+        return self.send(f":heartbeat: {service_name} alive @ {ts}")
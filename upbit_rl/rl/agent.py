@@ -1,19 +1,60 @@
 # upbit_rl/rl/agent.py
 import numpy as np
-from scipy.stats import beta as beta_dist
+from .numpy_policy import NumpyPolicy
+
+def load_actor(path: str):
+    """.npz (numpy_policy 로 내보낸 것) 면 NumpyPolicy - TF import 없음, 아니면 Keras 모델."""
+    if path.endswith(".npz"):
+        return NumpyPolicy.load(path)
+    import tensorflow as tf
+    return tf.keras.models.load_model(path, compile=False)
 
 class Agent:
-    def __init__(self, actor_beta, explore=True, min_alpha=1.0, min_beta=1.0):
+    def __init__(self, actor_beta, explore=True, min_alpha=1.0, min_beta=1.0, stateful=False, seed=None):
+        """actor_beta: Keras 모델 또는 NumpyPolicy (TF 없이 추론)."""
         self.actor = actor_beta
         self.explore = explore
         self.min_alpha = min_alpha
         self.min_beta = min_beta
+        self.rng = np.random.default_rng(seed)
+        if isinstance(actor_beta, NumpyPolicy):
+            self.policy = actor_beta
+            self.stateful = actor_beta.stateful() if stateful else None
+            return
+        from .inference import Policy, StatefulPolicy  # TF 는 Keras 모델일 때만
+        self.policy = Policy(actor_beta)
+        # stateful: 새 관측 1행씩 act_step() -> LSTM 셀 1회 (reset() 으로 초기화)
+        self.stateful = StatefulPolicy(actor_beta) if stateful else None
 
     def act(self, seq_state):
-        ab = self.actor.predict(seq_state, verbose=0)[0]  # [alpha_raw, beta_raw]
+        ab = self.policy(seq_state)[0][0]  # [alpha_raw, beta_raw]
+        return self._target(ab)
+
+    def act_batch(self, seq_states):
+        """(M, window, dim) -> (M,) 목표 비중. 모델 1회 호출로 여러 티커."""
+        ab = self.policy(seq_states)[0]
+        if not self.explore:
+            return self.mean_targets(ab)
+        return np.array([self._target(x) for x in ab])
+
+    def mean_targets(self, ab):
+        """(B, 2) raw 출력 -> (B,) Beta 평균 목표 비중 (explore=False 의 _target 과 같은 값)."""
+        ab = np.asarray(ab, dtype=np.float64)
+        a = ab[:, 0] + self.min_alpha
+        b = ab[:, 1] + self.min_beta
+        return np.clip(a / (a + b), 0.0, 1.0)
+
+    def reset(self):
+        self.stateful.reset()
+
+    def act_step(self, state):
+        ab = self.stateful.step(state)[0][0]
+        return self._target(ab)
+
+    def _target(self, ab):
         a = float(ab[0]) + self.min_alpha
         b = float(ab[1]) + self.min_beta
         if self.explore:
-            return float(np.clip(beta_dist.rvs(a, b), 0.0, 1.0))  # 샘플
+            return float(np.clip(self.rng.beta(a, b), 0.0, 1.0))  # 샘플
         # 평가/실거래: 평균
         return float(np.clip(a/(a+b), 0.0, 1.0))
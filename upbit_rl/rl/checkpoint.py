@@ -0,0 +1,52 @@
+# upbit_rl/rl/checkpoint.py
+"""학습 체크포인트: 모델 가중치 + 옵티마이저 상태(모멘트/step) + epoch + NumPy RNG 상태.
+
+tf.train.CheckpointManager 로 directory/ckpt-<epoch> 에 최근 keep 개를 남기고,
+같은 번호로 ckpt-<epoch>.rng.npz (np.random 전역 상태) 를 옆에 둔다.
+--resume 은 최신 체크포인트를 복원하고 다음 epoch 부터 이어간다 (RNG 까지 같아 중단 없이 돌린 것과 같은 난수열).
+"""
+import glob, os
+from typing import Dict, Optional
+import numpy as np
+import tensorflow as tf
+
+class Checkpointer:
+    def __init__(self, directory: str, models: Dict[str, tf.keras.Model], optimizers: Dict[str, Optional[tf.keras.optimizers.Optimizer]], keep: int = 3):
+        """models/optimizers: 이름 -> 객체 (None 은 건너뜀, 예: 공유 트렁크의 critic). optimizers 는 같은 이름의 모델 변수로 build."""
+        self.directory = directory
+        self.epoch = tf.Variable(-1, dtype=tf.int64, trainable=False)
+        self.models = {k: m for k, m in models.items() if m is not None}
+        self.optimizers = {k: o for k, o in optimizers.items() if o is not None}
+        self.ckpt = tf.train.Checkpoint(epoch=self.epoch, **self.models, **{f"opt_{k}": o for k, o in self.optimizers.items()})
+        self.manager = tf.train.CheckpointManager(self.ckpt, directory, max_to_keep=keep)
+
+    def save(self, epoch: int) -> str:
+        """epoch 까지 끝난 상태 저장 -> 체크포인트 prefix."""
+        self.epoch.assign(epoch)
+        path = self.manager.save(checkpoint_number=epoch)
+        kind, keys, pos, has_gauss, cached = np.random.get_state()
+        np.savez(path + ".rng.npz", keys=keys, pos=pos, has_gauss=has_gauss, cached=cached)
+        # CheckpointManager 가 지운 오래된 ckpt 의 RNG 파일 정리
+        live = set(self.manager.checkpoints)
+        for f in glob.glob(os.path.join(self.directory, "ckpt-*.rng.npz")):
+            if f[: -len(".rng.npz")] not in live:
+                os.remove(f)
+        return path
+
+    def restore(self) -> int:
+        """최신 체크포인트 복원 -> 다음에 돌릴 epoch (없으면 0)."""
+        path = self.manager.latest_checkpoint
+        if path is None:
+            return 0
+        # Keras 옵티마이저 슬롯 변수는 첫 apply 때 생기므로 미리 build 해야 모멘트까지 복원된다
+        for k, opt in self.optimizers.items():
+            model = self.models.get(k)
+            if model is not None and not opt.built:
+                opt.build(model.trainable_variables)
+        self.ckpt.restore(path).assert_existing_objects_matched()
+        rng = path + ".rng.npz"
+        if os.path.exists(rng):
+            with np.load(rng) as z:
+                np.random.set_state(("MT19937", z["keys"], int(z["pos"]), int(z["has_gauss"]), float(z["cached"])))
+        print(f"[checkpoint] resumed {path} (epoch {int(self.epoch.numpy())})")
+        return int(self.epoch.numpy()) + 1
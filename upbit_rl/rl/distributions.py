@@ -0,0 +1,10 @@
+# upbit_rl/rl/distributions.py
+"""정책 분포 log-prob (학습 루프 공용: train.py / train_ppo.py)."""
+import tensorflow as tf
+
+def beta_log_prob(a, alpha, beta):
+    """Beta(alpha, beta) 의 log p(a). a 는 (0, 1) 경계에서 log 가 발산하지 않도록 epsilon 으로 자른다."""
+    eps = 1e-6
+    a = tf.clip_by_value(a, eps, 1-eps)
+    logB = tf.math.lgamma(alpha) + tf.math.lgamma(beta) - tf.math.lgamma(alpha+beta)
+    return (alpha-1.0)*tf.math.log(a) + (beta-1.0)*tf.math.log(1.0-a) - logB
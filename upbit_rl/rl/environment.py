@@ -2,17 +2,35 @@
 import numpy as np
 import pandas as pd
 
+FEATURES = ["ret", "hl_spread", "v_z"]
+
+def make_features(ohlcv: pd.DataFrame):
+    """OHLCV -> (feats float32 (N,3), close float64 (N,)) 연속 배열."""
+    df = ohlcv.reset_index(drop=True).copy()
+    # 피처 전처리
+    df["ret"] = np.log(df["close"]).diff().fillna(0.0)
+    df["hl_spread"] = (df["high"] - df["low"]) / df["close"].replace(0, np.nan)
+    df["hl_spread"] = df["hl_spread"].fillna(0.0).clip(0, 0.2)
+    df["logv"] = np.log(df["volume"] + 1.0)
+    df["v_z"] = (df["logv"] - df["logv"].rolling(60, min_periods=1).mean()) / (df["logv"].rolling(60, min_periods=1).std(ddof=0) + 1e-8)
+    feats = np.ascontiguousarray(df[FEATURES].to_numpy(dtype=np.float32))
+    # 체결/평가 계산은 float64 유지 (float32면 KRW 단위 가격에서 오차 누적)
+    close = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float64))
+    return df, feats, close
+
+def fill(krw, qty, total, price, delta_w, fee: float):
+    """DailyOHLCVEnv.step 체결(수수료 포함) 을 마스크로 한 배열 버전: 비중 delta_w 만큼 시장가 매수/매도 -> (krw, qty)."""
+    buy_krw = np.where(delta_w > 1e-9, total * delta_w, 0.0)
+    sell_qty = np.where(delta_w < -1e-9, np.minimum(qty, total * np.maximum(-delta_w, 0.0) / price), 0.0)
+    proceeds = sell_qty * price
+    krw = krw - buy_krw + (proceeds - proceeds * fee)
+    qty = qty + (buy_krw - buy_krw * fee) / price - sell_qty
+    return krw, qty
+
 class DailyOHLCVEnv:
     def __init__(self, ohlcv: pd.DataFrame, fee: float = 0.0005, init_krw: float = 1_000_000, window: int = 30, trade_penalty: float = 0.0002):
-        df = ohlcv.reset_index(drop=True).copy()
-        # 피처 전처리
-        df["ret"] = np.log(df["close"]).diff().fillna(0.0)
-        df["hl_spread"] = (df["high"] - df["low"]) / df["close"].replace(0, np.nan)
-        df["hl_spread"] = df["hl_spread"].fillna(0.0).clip(0, 0.2)
-        df["logv"] = np.log(df["volume"] + 1.0)
-        df["v_z"] = (df["logv"] - df["logv"].rolling(60, min_periods=1).mean()) / (df["logv"].rolling(60, min_periods=1).std(ddof=0) + 1e-8)
-        self.df = df
-        self.N = len(df)
+        self.df, self.feats, self.close = make_features(ohlcv)
+        self.N = len(self.close)
         self.fee = float(fee)
         self.pen = float(trade_penalty)
         self.init_krw = float(init_krw)
@@ -23,13 +41,13 @@ class DailyOHLCVEnv:
         self.t = 0
         self.krw = self.init_krw
         self.qty = 0.0
-        self.price = float(self.df.loc[self.t, "close"])
+        self.price = float(self.close[self.t])
         self._update_total()
         return self._state()
 
     def step(self, target_weight: float):
-        target_weight = float(np.clip(target_weight, 0.0, 1.0))
-        self.price = float(self.df.loc[self.t, "close"])
+        target_weight = min(max(float(target_weight), 0.0), 1.0)
+        self.price = float(self.close[self.t])
         self._update_total()
         curr_w = 0.0 if self.total <= 0 else (self.qty * self.price) / self.total
         delta_w = target_weight - curr_w
@@ -50,7 +68,7 @@ class DailyOHLCVEnv:
 
         prev_total = self.total
         self.t = min(self.t + 1, self.N - 1)
-        self.price = float(self.df.loc[self.t, "close"])
+        self.price = float(self.close[self.t])
         self._update_total()
 
         # 로그수익 보상 + 거래패널티
@@ -59,9 +77,184 @@ class DailyOHLCVEnv:
         return self._state(), float(reward), bool(done), {"total": self.total, "weight": (self.qty * self.price) / max(self.total, 1e-9)}
 
     def _state(self):
-        row = self.df.loc[self.t, ["ret", "hl_spread", "v_z"]].astype(float).values
-        pos = 0.0 if self.total <= 0 else (self.qty * self.price) / self.total
-        return np.concatenate([row, [pos]]).astype(np.float32)
+        s = np.empty(len(FEATURES) + 1, dtype=np.float32)
+        s[:-1] = self.feats[self.t]
+        s[-1] = 0.0 if self.total <= 0 else (self.qty * self.price) / self.total
+        return s
+
+    def _update_total(self):
+        self.total = self.krw + self.qty * self.price
+
+class VectorDailyOHLCVEnv:
+    """K개 에피소드를 (K, ...) NumPy 상태 배열로 lockstep 진행 -> (K, dim) 관측 한 번에 반환.
+
+    ohlcvs: DataFrame 1개(starts 로 시작 오프셋만 다르게) 또는 티커별 DataFrame 리스트.
+    DataFrame 대신 (feats (N,3), close (N,)) 배열 쌍도 받는다 (features.load_features 의 memmap:
+    bar 간격과 무관, 에피소드 구간만 복사). 모든 에피소드는 같은 horizon(스텝 수)을 가지므로 동시에 done 이 된다.
+    """
+    def __init__(self, ohlcvs, starts=None, horizon=None, fee: float = 0.0005, init_krw: float = 1_000_000, window: int = 30, trade_penalty: float = 0.0002):
+        if isinstance(ohlcvs, (pd.DataFrame, tuple)):
+            ohlcvs = [ohlcvs]
+        data = [tuple(df) if isinstance(df, tuple) else make_features(df)[1:] for df in ohlcvs]
+        starts = [0] * len(data) if starts is None else [int(s) for s in starts]
+        if len(data) == 1:
+            data = data * len(starts)
+        if len(data) != len(starts):
+            raise ValueError(f"ohlcvs({len(data)}) and starts({len(starts)}) length mismatch")
+        avail = min(len(close) - 1 - s for (_, close), s in zip(data, starts))
+        horizon = avail if horizon is None else int(horizon)
+        if not 1 <= horizon <= avail:
+            raise ValueError(f"horizon must be in [1, {avail}], got {horizon}")
+        self.feats = np.stack([f[s:s + horizon + 1] for (f, _), s in zip(data, starts)])     # (K, H+1, 3) float32
+        self.close = np.stack([c[s:s + horizon + 1] for (_, c), s in zip(data, starts)])     # (K, H+1) float64
+        self.starts = np.array(starts)
+        self.K, self.N = self.close.shape
+        self.fee = float(fee)
+        self.pen = float(trade_penalty)
+        self.init_krw = float(init_krw)
+        self.window = int(window)
+        self.reset()
+
+    def reset(self):
+        self.t = 0
+        self.krw = np.full(self.K, self.init_krw)
+        self.qty = np.zeros(self.K)
+        self.price = self.close[:, self.t]
+        self._update_total()
+        return self._state()
+
+    def step(self, target_weights):
+        w = np.clip(np.asarray(target_weights, dtype=np.float64).reshape(self.K), 0.0, 1.0)
+        self.price = self.close[:, self.t]
+        self._update_total()
+        delta_w = w - self._weight()
+
+        self.krw, self.qty = fill(self.krw, self.qty, self.total, self.price, delta_w, self.fee)
+
+        prev_total = self.total
+        self.t = min(self.t + 1, self.N - 1)
+        self.price = self.close[:, self.t]
+        self._update_total()
+
+        reward = np.log(np.maximum(self.total, 1e-9) / np.maximum(prev_total, 1e-9)) - self.pen * np.abs(delta_w)
+        done = np.full(self.K, self.t == self.N - 1)
+        return self._state(), reward, done, {"total": self.total, "weight": (self.qty * self.price) / np.maximum(self.total, 1e-9)}
+
+    def _weight(self):
+        pos = np.zeros(self.K)
+        np.divide(self.qty * self.price, self.total, out=pos, where=self.total > 0)
+        return pos
+
+    def _state(self):
+        s = np.empty((self.K, len(FEATURES) + 1), dtype=np.float32)
+        s[:, :-1] = self.feats[:, self.t]
+        s[:, -1] = self._weight()
+        return s
 
     def _update_total(self):
         self.total = self.krw + self.qty * self.price
+
+class ObservationWindow:
+    """최근 window개 관측을 고정 링버퍼에 유지하고 (K, window, dim) zero-copy view 로 반환.
+
+    각 행을 p, p+window 두 곳에 기록해 buf[:, p:p+window] 가 항상 과거->최신 순 연속 구간이 된다.
+    step 당 비용은 에피소드 길이와 무관하게 O(dim). 초기값 0 은 앞쪽 0 패딩과 같다 (Masking 으로 무시).
+    반환 view 는 다음 push 때 덮어써지므로 보관하려면 copy 할 것.
+    """
+    def __init__(self, window: int, dim: int, batch: int = 1):
+        self.window = int(window)
+        self.buf = np.zeros((int(batch), 2 * self.window, int(dim)), dtype=np.float32)
+        self.pos = 0
+
+    def reset(self, obs=None):
+        self.buf[:] = 0.0
+        self.pos = 0
+        return self.view() if obs is None else self.push(obs)
+
+    def push(self, obs):
+        obs = np.asarray(obs, dtype=np.float32).reshape(self.buf.shape[0], -1)
+        self.buf[:, self.pos] = obs
+        self.buf[:, self.pos + self.window] = obs
+        self.pos = (self.pos + 1) % self.window
+        return self.view()
+
+    def view(self):
+        return self.buf[:, self.pos:self.pos + self.window]
+
+def align_ohlcv(ohlcvs):
+    """티커별 OHLCV 를 공통 날짜로 맞춘다 ('date' 컬럼이 없으면 최근 구간을 최소 길이로 자름)."""
+    if all("date" in df.columns for df in ohlcvs):
+        dates = [pd.to_datetime(df["date"]) for df in ohlcvs]
+        common = set(dates[0]).intersection(*dates[1:])
+        return [df[d.isin(common).to_numpy()].sort_values("date") for df, d in zip(ohlcvs, dates)]
+    n = min(len(df) for df in ohlcvs)
+    return [df.iloc[len(df) - n:] for df in ohlcvs]
+
+class PortfolioOHLCVEnv:
+    """여러 티커 포트폴리오 env: (T, M, 3) 피처 배열 + 티커별 목표 비중 벡터 action.
+
+    비중 합이 1 을 넘으면 1 로 정규화, 나머지는 KRW. 매도 먼저 체결 후 매수 (수수료 계산은 DailyOHLCVEnv 와 동일).
+    관측은 (M, dim): 티커별 피처 + 해당 티커의 현재 포트폴리오 비중.
+    """
+    def __init__(self, ohlcvs, fee: float = 0.0005, init_krw: float = 1_000_000, window: int = 30, trade_penalty: float = 0.0002):
+        data = [make_features(df)[1:] for df in align_ohlcv(list(ohlcvs))]
+        self.feats = np.ascontiguousarray(np.stack([f for f, _ in data], axis=1))   # (T, M, 3) float32
+        self.close = np.ascontiguousarray(np.stack([c for _, c in data], axis=1))   # (T, M) float64
+        self.N, self.M = self.close.shape
+        self.fee = float(fee)
+        self.pen = float(trade_penalty)
+        self.init_krw = float(init_krw)
+        self.window = int(window)
+        self.reset()
+
+    def reset(self):
+        self.t = 0
+        self.krw = self.init_krw
+        self.qty = np.zeros(self.M)
+        self.price = self.close[self.t]
+        self._update_total()
+        return self._state()
+
+    def step(self, target_weights):
+        w = np.clip(np.asarray(target_weights, dtype=np.float64).reshape(self.M), 0.0, 1.0)
+        if w.sum() > 1.0:
+            w = w / w.sum()
+        self.price = self.close[self.t]
+        self._update_total()
+        delta_w = w - self._weight()
+
+        # 매도 -> 매수 순 체결(수수료 포함)
+        sell_qty = np.where(delta_w < -1e-9, np.minimum(self.qty, self.total * np.maximum(-delta_w, 0.0) / self.price), 0.0)
+        proceeds = sell_qty * self.price
+        self.krw += float(np.sum(proceeds - proceeds * self.fee))
+        self.qty -= sell_qty
+        buy_krw = np.where(delta_w > 1e-9, self.total * delta_w, 0.0)
+        need = float(np.sum(buy_krw))
+        if need > max(self.krw, 0.0) * (1 + 1e-9):
+            # 매도 수수료만큼 KRW 가 모자라면 매수 금액을 비례 축소
+            buy_krw *= max(self.krw, 0.0) / need
+        self.krw -= float(np.sum(buy_krw))
+        self.qty += (buy_krw - buy_krw * self.fee) / self.price
+
+        prev_total = self.total
+        self.t = min(self.t + 1, self.N - 1)
+        self.price = self.close[self.t]
+        self._update_total()
+
+        reward = np.log(max(self.total, 1e-9) / max(prev_total, 1e-9)) - self.pen * float(np.sum(np.abs(delta_w)))
+        done = (self.t == self.N - 1)
+        return self._state(), float(reward), bool(done), {"total": self.total, "weights": self._weight()}
+
+    def _weight(self):
+        if self.total <= 0:
+            return np.zeros(self.M)
+        return self.qty * self.price / self.total
+
+    def _state(self):
+        s = np.empty((self.M, len(FEATURES) + 1), dtype=np.float32)
+        s[:, :-1] = self.feats[self.t]
+        s[:, -1] = self._weight()
+        return s
+
+    def _update_total(self):
+        self.total = self.krw + float(self.qty @ self.price)
@@ -0,0 +1,164 @@
+# upbit_rl/rl/features.py
+"""make_features 와 같은 피처 (ret, hl_spread, v_z) 를 청크/스트리밍으로 계산.
+
+분봉처럼 행이 수백만 개면 pandas 전체 프레임을 만들지 않고 OHLCVStore memmap 컬럼을
+청크 단위로 읽어 (N, 3) float32 배열(디스크 캐시 memmap) 에 쓴다.
+"""
+import numpy as np
+from .environment import FEATURES
+
+VOL_WINDOW = 60
+CHUNK = 1 << 16
+
+class RollingStats:
+    """고정 window 이동 평균/표준편차 (ddof=0, min_periods=1 - pandas rolling 과 같은 정의).
+
+    push(x): 값 1개 O(1) (누적합/제곱합 + 링버퍼), update(xs): 청크를 cumsum 으로 한 번에.
+    """
+    def __init__(self, window: int = VOL_WINDOW):
+        self.window = int(window)
+        self.buf = np.zeros(self.window)
+        self.pos = 0        # 다음에 쓸 링버퍼 위치
+        self.n = 0          # 지금까지 본 값 수
+        self.ref = None     # 누적 오차를 줄이기 위한 기준값 (첫 값)
+        self.s = self.s2 = 0.0
+
+    def tail(self) -> np.ndarray:
+        """최근 min(n, window) 개 값 (과거 -> 최신)."""
+        k = min(self.n, self.window)
+        return np.roll(self.buf, -self.pos)[self.window - k:]
+
+    def push(self, x: float):
+        x = float(x)
+        if self.ref is None:
+            self.ref = x
+        d = x - self.ref
+        if self.n >= self.window:
+            old = self.buf[self.pos] - self.ref
+            self.s -= old; self.s2 -= old * old
+        self.buf[self.pos] = x
+        self.s += d; self.s2 += d * d
+        self.pos = (self.pos + 1) % self.window
+        self.n += 1
+        if self.pos == 0:
+            self._resum()  # window 마다 다시 합산 (상쇄 오차 누적 방지), 분할 상환 O(1)
+        c = min(self.n, self.window)
+        mean = self.s / c
+        return mean + self.ref, np.sqrt(max(self.s2 / c - mean * mean, 0.0))
+
+    def update(self, xs):
+        """청크 xs (n,) -> (mean (n,), std (n,)). push 를 n 번 한 것과 같은 결과/상태."""
+        xs = np.asarray(xs, dtype=np.float64)
+        if len(xs) == 0:
+            return xs.copy(), xs.copy()
+        if self.ref is None:
+            self.ref = float(xs[0])
+        tail = self.tail()
+        ext = np.concatenate([tail, xs]) - self.ref
+        cs = np.concatenate([[0.0], np.cumsum(ext)])
+        cs2 = np.concatenate([[0.0], np.cumsum(ext * ext)])
+        i = len(tail) + np.arange(1, len(xs) + 1)              # ext 기준 (exclusive) 끝
+        c = np.minimum(self.n + np.arange(1, len(xs) + 1), self.window)
+        mean = (cs[i] - cs[i - c]) / c
+        var = (cs2[i] - cs2[i - c]) / c - mean * mean
+        # 상태: 마지막 window 개를 링버퍼에
+        last = np.concatenate([tail, xs])[-self.window:]
+        self.n += len(xs)
+        self.buf[:len(last)] = last
+        self.pos = len(last) % self.window
+        self._resum()
+        return mean + self.ref, np.sqrt(np.maximum(var, 0.0))
+
+    def _resum(self):
+        d = self.tail() - self.ref
+        self.s, self.s2 = float(d.sum()), float(d @ d)
+
+class FeatureStream:
+    """OHLCV bar 를 순서대로 받아 피처 행을 내는 상태 있는 변환기 (make_features 와 같은 값).
+
+    step(high, low, close, volume): 실시간 bar 1개 -> (3,) float32, O(1).
+    transform(high, low, close, volume): 청크 -> (n, 3) float32.
+    """
+    def __init__(self, vol_window: int = VOL_WINDOW):
+        self.stats = RollingStats(vol_window)
+        self.prev_close = None
+
+    def seed(self, close: float, volumes):
+        """이미 처리한 구간의 마지막 close 와 최근 거래량(최대 window-1 개) 으로 상태 복원."""
+        self.prev_close = float(close)
+        self.stats.update(np.log(np.asarray(volumes, dtype=np.float64) + 1.0))
+        return self
+
+    def step(self, high, low, close, volume):
+        high, low, close = float(high), float(low), float(close)
+        out = np.zeros(len(FEATURES), dtype=np.float32)
+        if self.prev_close is not None and self.prev_close > 0 and close > 0:
+            out[0] = np.log(close / self.prev_close)
+        if close != 0:
+            out[1] = min(max((high - low) / close, 0.0), 0.2)
+        logv = np.log(float(volume) + 1.0)
+        mean, std = self.stats.push(logv)
+        out[2] = (logv - mean) / (std + 1e-8)
+        self.prev_close = close
+        return out
+
+    def transform(self, high, low, close, volume):
+        high, low, close, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, volume))
+        out = np.empty((len(close), len(FEATURES)), dtype=np.float32)
+        if len(close) == 0:
+            return out
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logc = np.log(close)
+            prev = logc[0] if self.prev_close is None else np.log(self.prev_close)
+            ret = np.diff(logc, prepend=prev)
+            hl = (high - low) / np.where(close == 0, np.nan, close)
+        out[:, 0] = np.nan_to_num(ret, nan=0.0)
+        out[:, 1] = np.clip(np.nan_to_num(hl, nan=0.0), 0, 0.2)
+        logv = np.log(volume + 1.0)
+        mean, std = self.stats.update(logv)
+        out[:, 2] = (logv - mean) / (std + 1e-8)
+        self.prev_close = float(close[-1])
+        return out
+
+def stream_features(cols, out=None, start: int = 0, stream: FeatureStream = None, chunk: int = CHUNK):
+    """컬럼 배열 dict (OHLCVStore.arrays, memmap 가능) -> out[start:] 에 (N, 3) float32 피처를 청크로 기록."""
+    n = len(cols["close"])
+    if out is None:
+        out = np.empty((n, len(FEATURES)), dtype=np.float32)
+    stream = stream or FeatureStream()
+    for i in range(start, n, chunk):
+        j = min(i + chunk, n)
+        out[i:j] = stream.transform(cols["high"][i:j], cols["low"][i:j], cols["close"][i:j], cols["volume"][i:j])
+    return out
+
+def load_features(store, ticker: str, interval: str = "day", chunk: int = CHUNK):
+    """저장소 티커의 (feats (N, 3) float32, close (N,) float64) memmap.
+
+    피처는 {store}/{TICKER}/{interval}/feats.f4 에 캐시하고, 저장소에 새 bar 가 붙으면 그 뒤만 계산한다
+    (마지막 캐시 행은 진행 중 bar 가 덮어써졌을 수 있어 다시 계산). 과거 행이 병합돼 인덱스가 밀렸으면 전부 다시.
+    """
+    d = store.path(ticker, interval)
+    a = store.arrays(ticker, interval)
+    ts, n = a["ts"], len(a["ts"])
+    f, meta_f = d / "feats.f4", d / "feats.meta.i8"
+    dim = len(FEATURES)
+    meta = np.fromfile(meta_f, dtype="<i8") if meta_f.exists() else np.zeros(0, dtype="<i8")
+    m = 0
+    if len(meta) == 3 and 0 < meta[0] <= n and f.exists() and f.stat().st_size >= meta[0] * dim * 4 \
+            and ts[0] == meta[1] and ts[meta[0] - 1] == meta[2]:
+        m = int(meta[0]) - 1
+    if n == 0:
+        return np.empty((0, dim), dtype=np.float32), a["close"]
+    if m < n:
+        stream = FeatureStream()
+        if m > 0:
+            stream.seed(a["close"][m - 1], a["volume"][max(0, m - stream.stats.window + 1):m])
+        with open(f, "r+b" if f.exists() else "wb") as fh:
+            fh.truncate(n * dim * 4)
+        out = np.memmap(f, dtype="<f4", mode="r+", shape=(n, dim))
+        stream_features(a, out, start=m, stream=stream, chunk=chunk)
+        out.flush()
+        del out
+        # meta 는 마지막에: 중간에 끊기면 다음 호출에서 다시 계산
+        np.array([n, ts[0], ts[n - 1]], dtype="<i8").tofile(meta_f)
+    return np.memmap(f, dtype="<f4", mode="r", shape=(n, dim)), a["close"]
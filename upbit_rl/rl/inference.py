@@ -0,0 +1,68 @@
+# upbit_rl/rl/inference.py
+import numpy as np
+import tensorflow as tf
+from .networks import split_recurrent
+
+class Policy:
+    """Keras predict() 대신 tf.function 으로 컴파일한 forward.
+
+    actor (alpha_raw, beta_raw) 와 critic value 를 한 번의 호출로 반환한다.
+    입력 시그니처 (None, None, dim) 고정 -> batch/window 크기가 바뀌어도 재트레이싱 없음.
+    가중치는 변수 참조라 학습 중 업데이트가 그대로 반영된다.
+    actor 가 공유 트렁크 모델(make_actor_critic)이면 critic 없이 두 출력을 그대로 쓴다.
+    """
+    def __init__(self, actor, critic=None):
+        self.actor = actor
+        self.critic = critic
+        spec = tf.TensorSpec(shape=(None, None, actor.input_shape[-1]), dtype=tf.float32)
+        self._forward = tf.function(self._call, input_signature=[spec])
+
+    def _call(self, x):
+        ab = self.actor(x, training=False)
+        if isinstance(ab, (list, tuple)):
+            return ab[0], ab[1]
+        if self.critic is None:
+            return ab, tf.zeros_like(ab[:, :1])
+        return ab, self.critic(x, training=False)
+
+    def __call__(self, x):
+        """(B, T, dim) -> (ab (B, 2), v (B, 1)) numpy."""
+        ab, v = self._forward(tf.convert_to_tensor(np.asarray(x, dtype=np.float32)))
+        return ab.numpy(), v.numpy()
+
+class StatefulPolicy:
+    """LSTM (h, c) 를 호출 사이에 유지하는 증분 추론: step 당 LSTM 셀 1회 (window 회 대신).
+
+    reset() 후 관측을 한 행씩 step() 하면, 에피소드 시작부터의 전체 시퀀스를 Policy 에
+    넣은 결과와 같다. Masking 과 동일하게 전부 0 인 행은 상태를 갱신하지 않는다.
+    window 로 자른 Policy 입력과는 에피소드 길이가 window 이하일 때만 일치한다.
+    """
+    def __init__(self, actor, critic=None, batch: int = 1):
+        self.parts = [split_recurrent(m) for m in (actor, critic) if m is not None]
+        x_spec = tf.TensorSpec(shape=(None, actor.input_shape[-1]), dtype=tf.float32)
+        state_specs = tuple(tf.TensorSpec(shape=(None, lstm.units), dtype=tf.float32) for lstm, _ in self.parts for _ in range(2))
+        self._step = tf.function(self._call, input_signature=[x_spec, state_specs])
+        self.reset(batch)
+
+    def _call(self, x, states):
+        keep = tf.reduce_any(tf.not_equal(x, 0.0), axis=-1, keepdims=True)
+        outs, new_states = [], []
+        for i, (lstm, head) in enumerate(self.parts):
+            h, c = states[2 * i], states[2 * i + 1]
+            _, (h2, c2) = lstm.cell(x, [h, c], training=False)
+            h = tf.where(keep, h2, h); c = tf.where(keep, c2, c)
+            out = head(h, training=False)
+            outs += list(out) if isinstance(out, (list, tuple)) else [out]
+            new_states += [h, c]
+        v = outs[1] if len(outs) > 1 else tf.zeros_like(outs[0][:, :1])
+        return outs[0], v, tuple(new_states)
+
+    def reset(self, batch: int = None):
+        self.batch = int(batch or self.batch)
+        self.states = tuple(tf.zeros((self.batch, lstm.units)) for lstm, _ in self.parts for _ in range(2))
+
+    def step(self, obs):
+        """obs (B, dim) -> (ab (B, 2), v (B, 1)) numpy. 내부 (h, c) 갱신."""
+        x = tf.convert_to_tensor(np.asarray(obs, dtype=np.float32).reshape(self.batch, -1))
+        ab, v, self.states = self._step(x, self.states)
+        return ab.numpy(), v.numpy()
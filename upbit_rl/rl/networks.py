@@ -20,3 +20,20 @@ def make_critic(input_dim: int):
     x = layers.Dense(64, activation="relu")(x)
     v = layers.Dense(1, activation="linear")(x)
     return models.Model(x_in, v)
+
+def make_actor_critic(input_dim: int):
+    """LSTM(64)+Dense(64) 트렁크 하나를 공유하는 actor/critic: 출력 [alpha_beta (B,2), value (B,1)]."""
+    x_in = layers.Input(shape=(None, input_dim))
+    x = layers.Masking()(x_in)
+    x = layers.LSTM(64)(x)
+    x = layers.Dense(64, activation="relu")(x)
+    alpha = layers.Dense(1, activation="softplus")(x)
+    beta  = layers.Dense(1, activation="softplus")(x)
+    out = layers.Concatenate()([alpha, beta])
+    v = layers.Dense(1, activation="linear")(x)
+    return models.Model(x_in, [out, v])
+
+def split_recurrent(model):
+    """model -> (LSTM 레이어, LSTM 출력 -> 모델 출력 head). 1-step 증분 추론용 (가중치 공유)."""
+    lstm = next(l for l in model.layers if isinstance(l, layers.LSTM))
+    return lstm, models.Model(lstm.output, model.output)
@@ -0,0 +1,195 @@
+# upbit_rl/rl/numpy_policy.py
+"""TensorFlow 없이 도는 추론 전용 actor: Keras 모델 가중치를 .npz 로 내보내고 NumPy 로 forward.
+
+실거래/데몬은 예측만 하므로 TF import(수 초) 와 load_model 을 건너뛸 수 있다.
+지원 구조: networks.py 의 actor (Masking -> LSTM -> Dense -> Beta head [+ value head]). 다른 모델은 내보내기에서 ValueError.
+
+내보내기 (TF 필요, 한 번): python -m upbit_rl.rl.numpy_policy models/actor_latest.keras  -> models/actor_latest.npz
+"""
+import json
+import numpy as np
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "softplus": lambda x: np.logaddexp(0.0, x),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 0.5 * (1.0 + np.tanh(0.5 * x)),
+}
+def _topology(model):
+    """networks.py 의 actor 구조만 인식: Input -> Masking -> LSTM -> Dense(relu) -> Dense(softplus) x2 -> Concatenate
+    [+ Dense(linear) value]. 공개 API (model.layers / get_config / get_weights) 로 확인, 다르면 ValueError.
+    반환: 레이어 이름 -> 입력 레이어 이름 리스트, 출력 레이어 이름 리스트."""
+    by_kind = {}
+    for l in model.layers:
+        by_kind.setdefault(type(l).__name__, []).append(l)
+    extra = set(by_kind) - {"InputLayer", "Masking", "LSTM", "Dense", "Concatenate"}
+    if extra:
+        raise ValueError(f"numpy policy: unsupported layer(s) {sorted(extra)}")
+    dense = {}
+    for l in by_kind.get("Dense", []):
+        cfg = l.get_config()
+        if not cfg.get("use_bias", True):
+            raise ValueError(f"numpy policy: Dense without bias not supported ({l.name})")
+        dense.setdefault(cfg["activation"], []).append(l)
+    one = lambda k: len(by_kind.get(k, [])) == 1
+    value = dense.get("linear", [])
+    if not (one("InputLayer") and one("Masking") and one("LSTM") and one("Concatenate")
+            and len(dense.get("relu", [])) == 1 and len(dense.get("softplus", [])) == 2 and len(value) <= 1
+            and sum(map(len, dense.values())) == 3 + len(value)):
+        raise ValueError("numpy policy: expected networks.py actor (Input-Masking-LSTM-Dense(relu)-2xDense(softplus)-Concatenate[+Dense value]), "
+                         f"got {[(type(l).__name__, l.name) for l in model.layers]}")
+    lstm = by_kind["LSTM"][0].get_config()
+    if (lstm["return_sequences"] or lstm["return_state"] or lstm["go_backwards"] or lstm["stateful"] or not lstm["use_bias"]
+            or lstm["activation"] != "tanh" or lstm["recurrent_activation"] != "sigmoid"):
+        raise ValueError(f"numpy policy: only default LSTM(return_sequences=False) supported ({lstm['name']})")
+    if len(model.outputs) != 1 + len(value):
+        raise ValueError(f"numpy policy: expected {1 + len(value)} model output(s), got {len(model.outputs)}")
+    (inp,), (mask,), (rnn,), (trunk,), (alpha, beta), (cat,) = (by_kind["InputLayer"], by_kind["Masking"], by_kind["LSTM"],
+                                                                 dense["relu"], dense["softplus"], by_kind["Concatenate"])
+    edges = {inp.name: [], mask.name: [inp.name], rnn.name: [mask.name], trunk.name: [rnn.name],
+             alpha.name: [trunk.name], beta.name: [trunk.name], cat.name: [alpha.name, beta.name]}
+    edges.update({v.name: [trunk.name] for v in value})
+    return edges, [cat.name] + [v.name for v in value]
+
+def export_npz(model, path: str, check: bool = True) -> str:
+    """Keras 모델 -> .npz (레이어 그래프 JSON + 가중치). 반환: 저장 경로.
+
+    check: 임의 입력(앞쪽 0 패딩 포함)으로 Keras 출력과 NumPy forward 를 비교해 다르면 ValueError (alpha/beta 순서 등).
+    """
+    edges, outputs = _topology(model)
+    layers, arrays = [], {}
+    for l in model.layers:
+        kind, cfg = type(l).__name__, l.get_config()
+        spec = {"name": l.name, "type": kind, "inputs": edges[l.name]}
+        if kind == "Masking":
+            spec["mask_value"] = float(cfg["mask_value"])
+        elif kind == "LSTM":
+            spec["units"] = int(cfg["units"])
+        elif kind == "Dense":
+            spec["act"] = cfg["activation"]
+        for j, w in enumerate(l.get_weights()):
+            arrays[f"{l.name}/{j}"] = np.asarray(w, dtype=np.float32)
+        layers.append(spec)
+    graph = {"layers": layers, "outputs": outputs, "dim": int(model.input_shape[-1])}
+    if check:
+        x = np.random.default_rng(0).normal(size=(3, 7, graph["dim"])).astype(np.float32)
+        x[1, :3] = 0.0
+        ref = model(x, training=False)
+        ref = [np.asarray(r) for r in (ref if isinstance(ref, (list, tuple)) else [ref])]
+        got = NumpyPolicy(graph, dict(arrays)).forward(x)
+        err = max(float(np.abs(g - r).max()) for g, r in zip(got, ref))
+        if err > 1e-4:
+            raise ValueError(f"numpy policy: exported graph does not match the Keras model (max abs err {err:.2e})")
+    np.savez(path, graph=np.frombuffer(json.dumps(graph).encode(), dtype=np.uint8), **arrays)
+    return path if path.endswith(".npz") else path + ".npz"
+
+class NumpyPolicy:
+    """Policy 와 같은 호출 규약: (B, T, dim) -> (ab (B, 2), v (B, 1)) numpy.
+
+    모델 출력이 [ab, value] (공유 트렁크) 면 둘 다, 아니면 v 는 0. Masking 처럼 전부 0 인 행은 LSTM 상태를 갱신하지 않는다.
+    """
+    def __init__(self, graph: dict, weights: dict):
+        self.graph = graph
+        self.layers = graph["layers"]
+        self.w = weights
+        self.dim = graph["dim"]
+        self.input_shape = (None, None, self.dim)  # Keras 모델 대신 넘겨도 되게
+        for spec in self.layers:
+            if spec["type"] == "LSTM":
+                k, r, b = (self.w[f"{spec['name']}/{j}"] for j in range(3))
+                self.w[spec["name"]] = (k, r, b)
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyPolicy":
+        with np.load(path) as z:
+            graph = json.loads(z["graph"].tobytes().decode())
+            weights = {k: z[k] for k in z.files if k != "graph"}
+        return cls(graph, weights)
+
+    def stateful(self, batch: int = 1) -> "NumpyStatefulPolicy":
+        return NumpyStatefulPolicy(self, batch)
+
+    def _lstm(self, name, x, mask, state):
+        """x (B, T, D), mask (B, T) bool, state (h, c) -> (h, c). Keras 게이트 순서 i, f, c, o."""
+        k, r, b = self.w[name]
+        h, c = state
+        u = r.shape[0]
+        xk = x @ k + b  # 입력 항은 한 번에
+        full = mask.all(axis=0)
+        for t in range(x.shape[1]):
+            z = xk[:, t] + h @ r
+            z[:, :2 * u] = 0.5 * (1.0 + np.tanh(0.5 * z[:, :2 * u]))  # i, f: sigmoid
+            z[:, 3 * u:] = 0.5 * (1.0 + np.tanh(0.5 * z[:, 3 * u:]))  # o
+            c2 = z[:, u:2 * u] * c + z[:, :u] * np.tanh(z[:, 2 * u:3 * u])
+            h2 = z[:, 3 * u:] * np.tanh(c2)
+            if full[t]:
+                h, c = h2, c2
+            else:
+                keep = mask[:, t, None]
+                h, c = np.where(keep, h2, h), np.where(keep, c2, c)
+        return h, c
+
+    def forward(self, x, states: dict = None):
+        """그래프 평가. states: LSTM 이름 -> (h, c) 초기값 (주면 최종값으로 갱신)."""
+        x = np.asarray(x, dtype=np.float32)
+        vals, masks = {}, {}
+        for spec in self.layers:
+            name, kind, ins = spec["name"], spec["type"], spec["inputs"]
+            if kind == "InputLayer":
+                vals[name] = x
+                continue
+            v = vals[ins[0]]
+            m = masks.get(ins[0])
+            if kind == "Masking":
+                m = np.any(v != spec["mask_value"], axis=-1)
+                v = v * m[..., None]
+            elif kind == "LSTM":
+                if m is None:
+                    m = np.ones(v.shape[:2], dtype=bool)
+                zero = np.zeros((v.shape[0], spec["units"]), dtype=np.float32)
+                init = states.get(name, (zero, zero)) if states is not None else (zero, zero)
+                h, c = self._lstm(name, v, m, init)
+                if states is not None:
+                    states[name] = (h, c)
+                v, m = h, None
+            elif kind == "Dense":
+                v = ACTIVATIONS[spec["act"]](v @ self.w[f"{name}/0"] + self.w[f"{name}/1"])
+            elif kind == "Concatenate":
+                v = np.concatenate([vals[n] for n in ins], axis=-1)
+            vals[name] = v
+            if m is not None:
+                masks[name] = m
+        outs = [vals[n] for n in self.graph["outputs"]]
+        ab = outs[0]
+        v = outs[1] if len(outs) > 1 else np.zeros_like(ab[:, :1])
+        return ab.astype(np.float32), v.astype(np.float32)
+
+    def __call__(self, x):
+        return self.forward(x)
+
+class NumpyStatefulPolicy:
+    """StatefulPolicy 의 NumPy 판: (h, c) 를 호출 사이에 유지, step 당 LSTM 셀 1회."""
+    def __init__(self, policy: NumpyPolicy, batch: int = 1):
+        self.policy = policy
+        self.reset(batch)
+
+    def reset(self, batch: int = None):
+        self.batch = int(batch or getattr(self, "batch", 1))
+        self.states = {}
+
+    def step(self, obs):
+        """obs (B, dim) -> (ab (B, 2), v (B, 1)) numpy. 내부 (h, c) 갱신."""
+        x = np.asarray(obs, dtype=np.float32).reshape(self.batch, 1, -1)
+        return self.policy.forward(x, self.states)
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser()
+    p.add_argument("model", help="Keras actor (.keras)")
+    p.add_argument("--out", default=None, help="기본: 같은 이름 .npz")
+    args = p.parse_args()
+    import tensorflow as tf
+    model = tf.keras.models.load_model(args.model, compile=False)
+    out = export_npz(model, args.out or args.model.rsplit(".", 1)[0] + ".npz")
+    print(f"exported {args.model} -> {out}")
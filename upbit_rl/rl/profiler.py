@@ -0,0 +1,107 @@
+# upbit_rl/rl/profiler.py
+"""학습 계측: 단계별 wall-clock 타이머, epoch 지표 JSONL/TensorBoard 기록, tf.profiler trace 캡처.
+
+    timer = PhaseTimer()
+    with timer("env"): env.step(a)
+    log = MetricsLogger("runs/ppo1", tensorboard=True)
+    log.log(ep, {"return": r, **timer.flat()})   # runs/ppo1/metrics.jsonl 에 한 줄
+"""
+import json, os, time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+class PhaseTimer:
+    """이름별 누적 시간(초)/호출 수. 같은 이름을 여러 번 재면 합산 (step 안쪽 단계용, 호출당 ~1us)."""
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def __call__(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add(self, name: str, sec: float, count: int = 1):
+        self.totals[name] = self.totals.get(name, 0.0) + sec
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def merge(self, totals: Dict[str, float], counts: Dict[str, int] = None, scale: float = 1.0):
+        """다른 타이머(워커 등) 결과 합산. scale: 워커 평균을 낼 때 1/n."""
+        for k, v in totals.items():
+            self.add(k, v * scale, (counts or {}).get(k, 0))
+
+    def reset(self):
+        self.totals, self.counts = {}, {}
+
+    def flat(self, prefix: str = "time/") -> Dict[str, float]:
+        return {prefix + k: v for k, v in self.totals.items()}
+
+    def summary(self) -> str:
+        return " ".join(f"{k}={v:.2f}s" for k, v in self.totals.items())
+
+class MetricsLogger:
+    """epoch 지표 -> logdir/metrics.jsonl (한 줄 = {"step", "wall", ...}), tensorboard=True 면 같은 logdir 에 이벤트도.
+
+    logdir 가 비어 있으면 아무것도 쓰지 않는다. 실행 설정은 첫 줄 {"config": ...} 로 남겨 run 비교에 쓴다.
+    """
+    def __init__(self, logdir: str = "", tensorboard: bool = False, config: Optional[dict] = None):
+        self.logdir = logdir
+        self._f = None
+        self._tb = None
+        self._t0 = time.time()
+        if not logdir:
+            return
+        os.makedirs(logdir, exist_ok=True)
+        self._f = open(os.path.join(logdir, "metrics.jsonl"), "a")
+        if config is not None:
+            self._write({"config": config, "wall": self._t0})
+        if tensorboard:
+            import tensorflow as tf
+            self._tb = tf.summary.create_file_writer(logdir)
+
+    def _write(self, row: dict):
+        self._f.write(json.dumps(row) + "\n")
+        self._f.flush()
+
+    def log(self, step: int, metrics: Dict[str, float]):
+        if self._f is None:
+            return
+        metrics = {k: float(v) for k, v in metrics.items()}
+        self._write({"step": int(step), "wall": time.time() - self._t0, **metrics})
+        if self._tb is not None:
+            import tensorflow as tf
+            with self._tb.as_default():
+                for k, v in metrics.items():
+                    tf.summary.scalar(k, v, step=step)
+            self._tb.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        if self._tb is not None:
+            self._tb.close()
+            self._tb = None
+
+@contextmanager
+def trace(logdir: str, enabled: bool = True):
+    """enabled 면 블록 동안 tf.profiler trace 를 logdir 에 (TensorBoard Profile 탭에서 확인)."""
+    if not enabled or not logdir:
+        yield
+        return
+    import tensorflow as tf
+    tf.profiler.experimental.start(logdir)
+    try:
+        yield
+    finally:
+        tf.profiler.experimental.stop()
+
+def load_metrics(path: str) -> list:
+    """metrics.jsonl (또는 그 디렉터리) -> epoch 행 리스트 (config 행 제외)."""
+    if os.path.isdir(path):
+        path = os.path.join(path, "metrics.jsonl")
+    with open(path) as f:
+        return [r for r in map(json.loads, f) if "step" in r]
@@ -0,0 +1,56 @@
+# upbit_rl/rl/returns.py
+"""할인 수익/어드밴티지: (T,) 또는 lockstep 배치 (K, T) 를 한 번에.
+
+역방향 재귀 g_t = x_t + d * g_{t+1} 을 블록 단위 닫힌 식으로 계산한다:
+블록 안에서는 g_j = d^{-j} * revcumsum(d^s x_s)_j (float64), 블록 사이는 마지막 값만 이어 붙인다.
+블록 길이는 d^B 가 float64 범위 안에 머물도록 잡아 긴 에피소드(수십만 step)에서도 파이썬 루프는 T/B 회.
+"""
+import math
+import numpy as np
+
+BLOCK = 256
+
+def _block(d: float) -> int:
+    if d >= 1.0:
+        return BLOCK
+    return max(1, min(BLOCK, int(150 * math.log(10) / -math.log(d))))  # d^-B <= 1e150
+
+def discount(x, d: float, last=0.0):
+    """x (..., T) -> y (..., T) float64, y_t = sum_{s>=t} d^(s-t) x_s + d^(T-t) last."""
+    x = np.asarray(x, dtype=np.float64)
+    T = x.shape[-1]
+    out = np.empty_like(x)
+    carry = np.broadcast_to(np.asarray(last, dtype=np.float64), x.shape[:-1]).copy()
+    if T == 0:
+        return out
+    if d == 0.0:
+        out[...] = x
+        return out
+    B = _block(d)
+    powers = d ** np.arange(B + 1, dtype=np.float64)  # d^0 .. d^B
+    for hi in range(T, 0, -B):
+        lo = max(hi - B, 0)
+        n = hi - lo
+        p = powers[:n]
+        scaled = x[..., lo:hi] * p
+        local = np.cumsum(scaled[..., ::-1], axis=-1)[..., ::-1] / p
+        out[..., lo:hi] = local + carry[..., None] * powers[n:0:-1]  # d^(n-j)
+        carry = out[..., lo]
+    return out
+
+def discounted(rs, gamma=0.99):
+    """보상 -> 할인 수익 (종료 후 0). train.py / train_ppo.py 의 기존 역방향 루프와 같은 값, (K, T) 도 가능."""
+    return discount(rs, gamma).astype(np.float32)
+
+def gae(rewards, values, gamma=0.99, lam=0.95, last_value=0.0):
+    """GAE(lambda): rewards/values (..., T) -> (adv, returns) float32.
+
+    delta_t = r_t + gamma V_{t+1} - V_t (V_T = last_value), adv = discount(delta, gamma * lam), returns = adv + V.
+    lam=1 이면 adv = discounted(r) - V (기존 학습 루프와 동일), lam=0 이면 1-step TD.
+    """
+    r = np.asarray(rewards, dtype=np.float64)
+    v = np.asarray(values, dtype=np.float64)
+    last = np.broadcast_to(np.asarray(last_value, dtype=np.float64), v.shape[:-1])
+    v_next = np.concatenate([v[..., 1:], last[..., None]], axis=-1)
+    adv = discount(r + gamma * v_next - v, gamma * lam)
+    return adv.astype(np.float32), (adv + v).astype(np.float32)
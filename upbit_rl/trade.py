@@ -1,34 +1,229 @@
 # upbit_rl/trade.py (핵심 추가/변경만)
-import time, os, numpy as np, tensorflow as tf
+import argparse, json, time, os, numpy as np, pandas as pd
+from .broker.upbit_client import UpbitClient, summarize_timings
+from .broker.broker import Broker
+from .data.ohlcv import get_ohlcv
+from .data.store import interval_delta
+from .rl.environment import make_features
+from .rl.agent import Agent, load_actor
 from .notify.slack import SlackNotifier
 MIN_KRW = int(os.getenv("MIN_ORDER_KRW", "5000"))
 COOLDOWN_SEC = int(os.getenv("TRADE_COOLDOWN_SEC", "60"))
+STATE_PATH = os.getenv("TRADE_STATE", "data/trade_state.json")
 
-last_trade_ts = 0
-notifier = SlackNotifier()
-
-# ... actor 로드/target_w 계산 동일 ...
-
-if abs(delta_w) > args.thresh:
-    amt = bal["total_value"] * abs(delta_w)
-    if amt < MIN_KRW:
-        print(f"Skip: below MIN_KRW ({amt:.0f} < {MIN_KRW})")
-    elif time.time() - last_trade_ts < COOLDOWN_SEC:
-        print("Skip: cooldown")
-    else:
-        if delta_w > 0:
-            res = broker.place_market_buy(args.ticker, amt)
-            action_txt = f"BUY KRW {amt:.0f}"
+notifier = SlackNotifier(background=True)  # 주문 경로를 막지 않도록 큐에 넣고 백그라운드 전송 (종료 시 flush)
+
+def build_states(df, curr_w: float):
+    """OHLCV -> (N, dim) 상태. 과거 포지션은 알 수 없으므로 현재 비중으로 채운다."""
+    _, feats, _ = make_features(df)
+    pos = np.full((len(feats), 1), curr_w, dtype=np.float32)
+    return np.concatenate([feats, pos], axis=1)
+
+def load_state(path: str) -> dict:
+    """쿨다운/페이퍼 잔고 상태. 파일이 없으면 초기값."""
+    state = {"last_trade_ts": 0.0, "paper": None, "last_bar": None}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            state.update(json.load(f))
+    return state
+
+def save_state(path: str, state: dict):
+    """임시 파일에 쓰고 교체 (쓰는 도중 종료돼도 이전 상태가 남음)."""
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+class Trader:
+    """모델/클라이언트/브로커를 한 번만 만들고 rebalance() 를 반복 호출하는 상태 있는 트레이더.
+
+    마지막 거래 시각(쿨다운)과 페이퍼 잔고는 state 파일에 저장돼 재시작해도 이어진다.
+    rebalance() 는 단계별 시간 {"fetch", "infer", "order" (초), "submitted" (마지막 주문 제출 epoch 또는 None),
+    "exchange" ({거래소 호출 이름: (횟수, 합계 초)})} 을 반환.
+    """
+    def __init__(self, args, state_path: str = STATE_PATH):
+        if args.stateful and args.tickers:
+            raise SystemExit("--stateful: single ticker only (not with --tickers)")
+        self.args = args
+        self.tickers = [t.strip() for t in args.tickers.split(",") if t.strip()] if args.tickers else [args.ticker]
+        self.client = UpbitClient()
+        if args.ws:
+            self.client.subscribe(self.tickers)  # 가격은 WebSocket 피드 테이블에서 (오래되면 REST)
+        self.broker = Broker(self.client)
+        actor = load_actor(args.model)  # .npz 면 NumPy forward (TF import 없음)
+        self.stateful = bool(args.stateful)
+        self.agent = Agent(actor, explore=False, stateful=self.stateful)
+        self.state_path = state_path
+        self.state = load_state(state_path)
+        if self.broker.paper and self.state["paper"]:
+            self.broker.krw = self.state["paper"]["krw"]
+            self.broker.coins.update(self.state["paper"]["coins"])
+        self.fed_ts, self.fed_target = None, None  # stateful: LSTM 에 마지막으로 넣은 마감 bar 시각과 그때 목표 비중
+        # 첫 tick 이 tf.function 트레이싱 비용을 내지 않도록 미리 한 번 호출 (NumPy 경로는 그냥 빠름)
+        self.agent.policy(np.zeros((len(self.tickers), args.window, actor.input_shape[-1]), dtype=np.float32))
+
+    def ohlcv(self, ticker: str, bar_close=None, refresh: bool = True):
+        """최근 count 개 bar (refresh 면 저장소 증분 갱신). bar_close 가 주어지면 그 시각 전에 열린(=마감된) bar 만."""
+        df = get_ohlcv(ticker, count=self.args.count, force=refresh, interval=self.args.interval)
+        if bar_close is not None:
+            df = df[df["date"] < pd.Timestamp(bar_close)]
+        return df
+
+    def rebalance(self, bar_close=None, refresh: bool = True) -> dict:
+        self.client.reset_timings()
+        timing = self._rebalance_portfolio(bar_close, refresh) if self.args.tickers else self._rebalance_single(bar_close, refresh)
+        timing["exchange"] = summarize_timings(self.client.reset_timings())
+        if timing["exchange"]:
+            print("exchange calls: " + ", ".join(f"{k} x{n} {sec * 1e3:.0f}ms" for k, (n, sec) in timing["exchange"].items()))
+        if bar_close is not None:
+            self.state["last_bar"] = str(pd.Timestamp(bar_close))
+        self.save()
+        return timing
+
+    def save(self):
+        if self.broker.paper and self.broker.krw is not None:
+            self.state["paper"] = {"krw": self.broker.krw, "coins": dict(self.broker.coins)}
+        save_state(self.state_path, self.state)
+
+    def _cooldown(self) -> bool:
+        return time.time() - self.state["last_trade_ts"] < COOLDOWN_SEC
+
+    def _rebalance_single(self, bar_close=None, refresh: bool = True) -> dict:
+        args, ticker = self.args, self.tickers[0]
+        t0 = time.perf_counter()
+        bal = self.broker.get_balance(ticker)
+        price = self.client.get_price(ticker)
+        curr_w = bal["coin_value"] / max(bal["total_value"], 1e-9)
+        df = self.ohlcv(ticker, bar_close, refresh)
+        t1 = time.perf_counter()
+        if self.stateful:
+            target_w = self._stateful_target(df, curr_w, bar_close)
         else:
-            sell_qty = min((bal["total_value"] * (-delta_w)) / price, bal["coin_qty"])
-            res = broker.place_market_sell(args.ticker, sell_qty)
-            action_txt = f"SELL {sell_qty:.6f}"
-
-        last_trade_ts = time.time()
-        msg = (f"*Trade* {action_txt}\n"
-               f"- target_w: {target_w:.3f}, curr_w: {curr_w:.3f}\n"
-               f"- price: {price:.0f}, fee: {res.fee:.0f}\n"
-               f"- total: {bal['total_value']:.0f} → (post) ?")
-        notifier.send(msg)
-else:
-    print("No trade (within threshold).")
+            target_w = self.agent.act(build_states(df, curr_w)[None, -args.window:])
+        delta_w = target_w - curr_w
+        print(f"{ticker} price={price:.0f} curr_w={curr_w:.3f} target_w={target_w:.3f}")
+        t2 = time.perf_counter()
+
+        submitted = None
+        if abs(delta_w) > args.thresh:
+            amt = bal["total_value"] * abs(delta_w)
+            if amt < MIN_KRW:
+                print(f"Skip: below MIN_KRW ({amt:.0f} < {MIN_KRW})")
+            elif self._cooldown():
+                print("Skip: cooldown")
+            else:
+                if delta_w > 0:
+                    res = self.broker.place_market_buy(ticker, amt, price)
+                    action_txt = f"BUY KRW {amt:.0f}"
+                else:
+                    sell_qty = min((bal["total_value"] * (-delta_w)) / price, bal["coin_qty"])
+                    res = self.broker.place_market_sell(ticker, sell_qty, price)
+                    action_txt = f"SELL {sell_qty:.6f}"
+                submitted = time.time()
+                self.state["last_trade_ts"] = submitted
+                msg = (f"*Trade* {action_txt}\n"
+                       f"- target_w: {target_w:.3f}, curr_w: {curr_w:.3f}\n"
+                       f"- price: {price:.0f}, fee: {res.fee:.0f}\n"
+                       f"- total: {bal['total_value']:.0f} → (post) ?")
+                notifier.send(msg)
+        else:
+            print("No trade (within threshold).")
+        return {"fetch": t1 - t0, "infer": t2 - t1, "order": time.perf_counter() - t2, "submitted": submitted}
+
+    def _stateful_target(self, df, curr_w: float, bar_close=None) -> float:
+        """증분 LSTM: 마감된 bar 중 이전 tick 이후 새 것만 셀에 넣는다.
+
+        처음/재시작/구간이 끊겼으면 reset 후 최근 window 개만 (윈도우 모델과 같은 문맥).
+        새로 마감된 bar 가 없으면 셀 상태를 그대로 두고 직전 목표 비중을 쓴다.
+        """
+        now = pd.Timestamp(bar_close) if bar_close is not None else pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None)
+        closed = (df["date"] + interval_delta(self.args.interval) <= now).to_numpy()  # 형성 중인 마지막 bar 제외
+        ts = df["date"].to_numpy()[closed]
+        if len(ts) == 0:
+            raise RuntimeError(f"No closed {self.args.interval} bar before {now}")
+        if self.fed_ts is not None and ts[-1] <= self.fed_ts:
+            return self.fed_target
+        window = self.args.window
+        new = np.nonzero(ts > self.fed_ts)[0] if self.fed_ts is not None and self.fed_ts >= ts[0] else None
+        if new is None or len(new) > window:
+            self.agent.reset()
+            new = np.arange(max(len(ts) - window, 0), len(ts))
+        states = build_states(df[closed], curr_w)  # 피처(수익률/거래량 z) 는 앞쪽 bar 까지 써서 계산
+        for s in states[new]:
+            target_w = self.agent.act_step(s)
+        self.fed_ts, self.fed_target = ts[-1], target_w
+        return target_w
+
+    def _rebalance_portfolio(self, bar_close=None, refresh: bool = True) -> dict:
+        """여러 티커를 한 프로세스에서: 잔고/현재가 1회 조회, target_w 모델 1회 호출, 매도 -> 매수 순 동시 주문.
+
+        단일 티커 모델을 그대로 쓰기 위해 티커마다 자본 1/M 슬리브를 두고,
+        모델 입력 포지션과 출력 목표 비중을 슬리브 기준으로 해석한다.
+        """
+        args, tickers = self.args, self.tickers
+        M = len(tickers)
+        t0 = time.perf_counter()
+        pf = self.broker.get_portfolio(tickers)
+        total = pf["total_value"]
+        curr_w = np.array([pf["value"][t] / max(total, 1e-9) for t in tickers])
+        dfs = [self.ohlcv(t, bar_close, refresh) for t in tickers]
+        t1 = time.perf_counter()
+        seqs = np.stack([build_states(df, min(curr_w[i] * M, 1.0))[-args.window:] for i, df in enumerate(dfs)])
+        target_w = self.agent.act_batch(seqs) / M
+        delta_w = target_w - curr_w
+        for t, cw, tw in zip(tickers, curr_w, target_w):
+            print(f"{t} price={pf['price'][t]:.0f} curr_w={cw:.3f} target_w={tw:.3f}")
+        t2 = time.perf_counter()
+
+        submitted = None
+        if self._cooldown():
+            print("Skip: cooldown")
+            return {"fetch": t1 - t0, "infer": t2 - t1, "order": 0.0, "submitted": None}
+        orders, lines = [], []
+        for i in np.argsort(delta_w):  # 매도(음수) 먼저 -> KRW 확보 후 매수
+            t, d = tickers[i], delta_w[i]
+            if abs(d) <= args.thresh:
+                continue
+            amt = total * abs(d)
+            if amt < MIN_KRW:
+                print(f"Skip {t}: below MIN_KRW ({amt:.0f} < {MIN_KRW})")
+                continue
+            orders.append((t, "buy", amt) if d > 0 else (t, "sell", min(amt / pf["price"][t], pf["qty"][t])))
+        # 매도 묶음 -> 매수 묶음을 각각 동시에 제출 (가격은 위에서 받은 것 재사용)
+        for (t, side, amt), res in zip(orders, self.broker.submit_orders(orders, pf["price"])):
+            i = tickers.index(t)
+            if isinstance(res, Exception):
+                print(f"Order failed {t} {side}: {res}")
+                lines.append(f"- {t} {side.upper()} FAILED: {res}")
+                continue
+            what = f"BUY KRW {amt:.0f}" if side == "buy" else f"SELL {amt:.6f}"
+            lines.append(f"- {t} {what} (w {curr_w[i]:.3f}→{target_w[i]:.3f}, fee {res.fee:.0f})")
+            submitted = max(submitted or 0.0, res.ts)
+        if submitted is not None:
+            self.state["last_trade_ts"] = submitted
+        if lines:
+            notifier.send("*Rebalance*\n" + "\n".join(lines) + f"\n- total: {total:.0f}")
+        else:
+            print("No trade (within threshold).")
+        return {"fetch": t1 - t0, "infer": t2 - t1, "order": time.perf_counter() - t2, "submitted": submitted}
+
+def main(args):
+    Trader(args).rebalance()
+
+def add_args(p: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    p.add_argument("--ticker", default=os.getenv("TICKER","KRW-BTC"))
+    p.add_argument("--tickers", default=os.getenv("TICKERS", ""), help="쉼표 구분 여러 티커 -> 포트폴리오 리밸런스")
+    p.add_argument("--model", default="models/actor_latest.keras", help=".npz (numpy_policy 로 내보낸 것) 면 TF 없이 추론")
+    p.add_argument("--interval", default="day", help="bar 간격 (day, minute1, minute60 ...)")
+    p.add_argument("--count", type=int, default=200)
+    p.add_argument("--window", type=int, default=30)
+    p.add_argument("--thresh", type=float, default=0.05)
+    p.add_argument("--stateful", action="store_true", help="증분(stateful) LSTM 으로 target_w 계산 (단일 티커)")
+    p.add_argument("--ws", action="store_true", help="WebSocket 시세 피드로 현재가 조회 (daemon 에서 유용)")
+    return p
+
+if __name__ == "__main__":
+    main(add_args(argparse.ArgumentParser()).parse_args())
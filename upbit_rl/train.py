@@ -3,49 +3,32 @@ import numpy as np
 import tensorflow as tf
 
 from .data.ohlcv import get_ohlcv
-from .rl.environment import DailyOHLCVEnv
-from .rl.networks import make_actor, make_critic
+from .rl.environment import DailyOHLCVEnv, ObservationWindow
+from .rl.networks import make_actor_beta, make_critic
+from .rl.inference import Policy
+from .rl.profiler import PhaseTimer, MetricsLogger, trace
+from .rl.returns import discounted
+from .rl.checkpoint import Checkpointer
+from .rl.distributions import beta_log_prob
 
-def discounted(rs, gamma=0.99):
-    out=[]; g=0.0
-    for r in rs[::-1]:
-        g = r + gamma*g
-        out.append(g)
-    return np.array(out[::-1], dtype=np.float32)
-
-def pad_seq(states, window, dim):
-    x = np.vstack(states)[-window:]
-    if len(x) < window:
-        pad = np.zeros((window-len(x), dim), dtype=np.float32)
-        x = np.vstack([pad, x])
-    return x[None, ...]
-
-def main(args):
-    df = get_ohlcv(args.ticker, count=args.count)
-    env = DailyOHLCVEnv(df, fee=float(os.getenv("UPBIT_FEE", "0.0005")), init_krw=1_000_000, window=args.window)
-
-    input_dim = env._state().shape[0]
-    actor = make_actor(input_dim)
-    critic = make_critic(input_dim)
-
-    opt_a = tf.keras.optimizers.Adam(args.lr)
-    opt_c = tf.keras.optimizers.Adam(args.lr)
-
-    for ep in range(args.epochs):
-        s = env.reset()
-        done = False
-        states = [s]
-        s_hist=[]; a_hist=[]; r_hist=[]; v_hist=[]
+def episode(env, win, policy, actor, critic, opt_a, opt_c, gamma, timer):
+    """에피소드 1회 수집 + 업데이트 1회 -> (return, loss_a, loss_c, steps). timer 에 rollout(policy/env)/update 시간 누적."""
+    seq = win.reset(env.reset())  # (1, window, dim)
+    done = False
+    s_hist=[]; a_hist=[]; r_hist=[]; v_hist=[]
 
+    with timer("rollout"):
         while not done:
-            seq = pad_seq(states, args.window, input_dim)
-            v = float(critic.predict(seq, verbose=0)[0,0])
-            a = float(actor.predict(seq, verbose=0)[0,0])
-            s_next, r, done, info = env.step(a)
-            s_hist.append(seq); a_hist.append([a]); r_hist.append(r); v_hist.append(v)
-            states.append(s_next)
+            with timer("policy"):
+                ab, v = policy(seq)
+            a = float(np.random.beta(ab[0,0] + 1.0, ab[0,1] + 1.0)); v = float(v[0,0])  # Beta(alpha, beta) 에서 목표 비중 샘플
+            with timer("env"):
+                s_next, r, done, info = env.step(a)
+            s_hist.append(seq.copy()); a_hist.append([a]); r_hist.append(r); v_hist.append(v)
+            seq = win.push(s_next)
 
-        returns = discounted(r_hist, gamma=args.gamma)
+    with timer("update"):
+        returns = discounted(r_hist, gamma=gamma)
         adv = returns - np.array(v_hist, dtype=np.float32)
 
         S = np.concatenate(s_hist, axis=0)
@@ -54,22 +37,51 @@ def main(args):
         ADV = adv.astype(np.float32)
 
         with tf.GradientTape() as ta, tf.GradientTape() as tc:
-            pi = actor(S, training=True)  # (T,1) in [0,1]
-            # Bernoulli-like log-prob around action A (continuous [0,1] approx)
-            logp = A * tf.math.log(pi + 1e-6) + (1.0 - A) * tf.math.log(1.0 - pi + 1e-6)
+            ab = actor(S, training=True)  # (T,2) softplus -> alpha, beta = +1
+            logp = beta_log_prob(A, ab[:,0:1] + 1.0, ab[:,1:2] + 1.0)
             loss_a = -tf.reduce_mean(logp[:,0] * ADV)
             v_pred = critic(S, training=True)[:,0]
             loss_c = tf.keras.losses.MSE(v_pred, R)
 
         opt_a.apply_gradients(zip(ta.gradient(loss_a, actor.trainable_weights), actor.trainable_weights))
         opt_c.apply_gradients(zip(tc.gradient(loss_c, critic.trainable_weights), critic.trainable_weights))
+        loss_a, loss_c = float(loss_a), float(loss_c)
+    return float(np.sum(r_hist)), loss_a, loss_c, len(r_hist)
+
+def main(args):
+    df = get_ohlcv(args.ticker, count=args.count)
+    env = DailyOHLCVEnv(df, fee=float(os.getenv("UPBIT_FEE", "0.0005")), init_krw=1_000_000, window=args.window)
+
+    input_dim = env._state().shape[0]
+    actor = make_actor_beta(input_dim)
+    critic = make_critic(input_dim)
+
+    opt_a = tf.keras.optimizers.Adam(args.lr)
+    opt_c = tf.keras.optimizers.Adam(args.lr)
+    policy = Policy(actor, critic)
+    ckpt = Checkpointer(args.ckpt_dir, {"actor": actor, "critic": critic}, {"actor": opt_a, "critic": opt_c}, keep=args.keep)
+    start = ckpt.restore() if args.resume else 0
 
-        ep_ret = float(np.sum(r_hist))
-        print(f"[EP {ep}] return={ep_ret:.5f}  loss_a={float(loss_a):.5f}  loss_c={float(loss_c):.5f}")
+    win = ObservationWindow(args.window, input_dim)
+    timer = PhaseTimer()
+    logger = MetricsLogger(args.logdir, tensorboard=args.tensorboard, config=vars(args))
+    for ep in range(start, args.epochs):
+        timer.reset()
+        with trace(args.logdir, enabled=ep == args.profile_epoch):
+            ep_ret, loss_a, loss_c, steps = episode(env, win, policy, actor, critic, opt_a, opt_c, args.gamma, timer)
+        if args.ckpt_every > 0 and ((ep + 1) % args.ckpt_every == 0 or ep == args.epochs - 1):
+            with timer("checkpoint"):
+                ckpt.save(ep)
+        logger.log(ep, {"return": ep_ret, "loss_a": loss_a, "loss_c": loss_c, **timer.flat(),
+                        "throughput/steps_per_s": steps / timer.totals["rollout"],
+                        "throughput/update_samples_per_s": steps / timer.totals["update"]})
+        print(f"[EP {ep}] return={ep_ret:.5f}  loss_a={loss_a:.5f}  loss_c={loss_c:.5f}  "
+              f"({steps / timer.totals['rollout']:,.0f} steps/s) | {timer.summary()}")
+    logger.close()
 
     os.makedirs("models", exist_ok=True)
-    actor.save("models/actor_latest.h5")
-    critic.save("models/critic_latest.h5")
+    actor.save("models/actor_latest.keras")
+    critic.save("models/critic_latest.keras")
     print("Saved models to models/")
 
 if __name__ == "__main__":
@@ -80,5 +92,12 @@ if __name__ == "__main__":
     p.add_argument("--epochs", type=int, default=5)
     p.add_argument("--lr", type=float, default=1e-3)
     p.add_argument("--gamma", type=float, default=0.99)
+    p.add_argument("--ckpt_dir", default="models/ckpt_a2c", help="체크포인트 디렉터리")
+    p.add_argument("--ckpt_every", type=int, default=1, help="N epoch 마다 체크포인트 (0: 끔)")
+    p.add_argument("--keep", type=int, default=3, help="남길 재개용 체크포인트 수")
+    p.add_argument("--resume", action="store_true", help="--ckpt_dir 최신 체크포인트에서 이어서 학습")
+    p.add_argument("--logdir", default="", help="epoch 지표 JSONL(metrics.jsonl) 기록 디렉터리 (비우면 기록 안 함)")
+    p.add_argument("--tensorboard", action="store_true", help="--logdir 에 TensorBoard 스칼라도 기록")
+    p.add_argument("--profile_epoch", type=int, default=-1, help="이 epoch 의 tf.profiler trace 를 --logdir 에 캡처")
     args = p.parse_args()
     main(args)
\ No newline at end of file
@@ -1,90 +1,268 @@
 # upbit_rl/train_ppo.py
-import argparse, os, numpy as np, tensorflow as tf
-from tensorflow.keras import backend as K
+import argparse, os, time, multiprocessing as mp, numpy as np, tensorflow as tf
 from .data.ohlcv import get_ohlcv
-from .rl.environment import DailyOHLCVEnv
-from .rl.networks import make_actor_beta, make_critic
-
-def beta_log_prob(a, alpha, beta):
-    # 안정성 위해 epsilon
-    eps = 1e-6
-    a = K.clip(a, eps, 1-eps)
-    logB = tf.math.lgamma(alpha) + tf.math.lgamma(beta) - tf.math.lgamma(alpha+beta)
-    return (alpha-1.0)*tf.math.log(a) + (beta-1.0)*tf.math.log(1.0-a) - logB
-
-def discounted(rs, gamma=0.99):
-    out=[]; g=0.0
-    for r in rs[::-1]:
-        g = r + gamma*g; out.append(g)
-    return np.array(out[::-1], dtype=np.float32)
+from .data.store import OHLCVStore
+from .rl.environment import VectorDailyOHLCVEnv, ObservationWindow
+from .rl.networks import make_actor_beta, make_critic, make_actor_critic
+from .rl.inference import Policy
+from .rl.features import load_features
+from .rl.profiler import PhaseTimer, MetricsLogger, trace
+from .rl.returns import gae
+from .rl.distributions import beta_log_prob
+from .rl.checkpoint import Checkpointer
+
+def minibatches(n, batch_size, shuffle=True):
+    idx = np.random.permutation(n) if shuffle else np.arange(n)
+    for i in range(0, n, batch_size):
+        yield idx[i:i+batch_size]
+
+def make_update(actor, critic, opt_a, opt_c, clip_eps=0.2, vf_coef=0.5):
+    """PPO 1 gradient step (tf.function). critic=None 이면 actor 는 공유 트렁크 모델 (loss_a + vf_coef*loss_c, 옵티마이저 1개).
+
+    입력: S (B, window, dim), A/old_logp/adv (B, 1), ret (B,) float32.
+    """
+    specs = [tf.TensorSpec((None, None, actor.input_shape[-1]), tf.float32)] + \
+            [tf.TensorSpec((None, 1), tf.float32)] * 3 + [tf.TensorSpec((None,), tf.float32)]
+    @tf.function(input_signature=specs)
+    def update(S, A, old_logp, adv, ret):
+        with tf.GradientTape() as ta, tf.GradientTape() as tc:
+            if critic is None:
+                ab, v_pred = actor(S, training=True)
+            else:
+                ab = actor(S, training=True)
+                v_pred = critic(S, training=True)
+            alpha = ab[:,0:1] + 1.0
+            beta  = ab[:,1:2] + 1.0
+            logp = beta_log_prob(A, alpha, beta)
+            ratio = tf.exp(logp - old_logp)
+            loss_a = -tf.reduce_mean(tf.minimum(ratio*adv,
+                          tf.clip_by_value(ratio, 1.0-clip_eps, 1.0+clip_eps)*adv))
+            loss_c = tf.reduce_mean(tf.square(v_pred[:,0] - ret))
+            loss = loss_a + vf_coef*loss_c
+        if critic is None:
+            opt_a.apply_gradients(zip(ta.gradient(loss, actor.trainable_weights), actor.trainable_weights))
+        else:
+            opt_a.apply_gradients(zip(ta.gradient(loss_a, actor.trainable_weights), actor.trainable_weights))
+            opt_c.apply_gradients(zip(tc.gradient(loss_c, critic.trainable_weights), critic.trainable_weights))
+        return loss_a, loss_c
+    return update
+
+def make_models(input_dim, shared=False):
+    if shared:
+        # 공유 트렁크: LSTM 1회로 (alpha, beta) + V
+        return make_actor_critic(input_dim), None
+    return make_actor_beta(input_dim), make_critic(input_dim)
+
+def make_env(df, starts, horizon, window):
+    return VectorDailyOHLCVEnv(df, starts=starts, horizon=horizon, fee=float(os.getenv("UPBIT_FEE","0.0005")), init_krw=1_000_000, window=window)
+
+def rollout(env, win, policy, window, timer=None):
+    """에피소드 1회 수집 -> obs (K, window-1+T, dim) 와 A/R/old_logp/V (K, T).
+
+    obs 는 앞쪽 0 패딩된 관측 원본: step t 에서 정책이 본 입력 = obs[:, t:t+window].
+    행동은 업데이트와 같은 window 입력 분포에서 샘플한다 (증분 LSTM 은 에피소드 전체 상태를 들고 있어
+    window 로 자른 분포와 달라 PPO ratio 가 어긋나므로 학습에는 쓰지 않는다, 추론 전용).
+    timer(PhaseTimer) 에 step 안쪽 단계 policy / env / logp 시간을 누적한다.
+    """
+    timer = timer or PhaseTimer()
+    T = env.N - 1
+    obs = np.zeros((env.K, window - 1 + T, win.buf.shape[2]), dtype=np.float32)
+    S = win.reset(env.reset()); done=False
+    t=0; A=[]; R=[]; old_logp=[]; V=[]
+    while not done:
+        obs[:, window - 1 + t] = S[:, -1]
+        with timer("policy"):
+            ab, v = policy(S); V.append(v[:,0])
+            alpha = ab[:,0] + 1.0; beta = ab[:,1] + 1.0
+            a = np.random.beta(alpha, beta)
+        with timer("env"):
+            s2, r, d, info = env.step(a)
+        done = bool(d.all())
+        A.append(a); R.append(r)
+        S = win.push(s2); t += 1
+        # old_logp 저장
+        with timer("logp"):
+            old_logp.append(beta_log_prob(tf.constant(a[:,None],dtype=tf.float32),
+                                          tf.constant(alpha[:,None],dtype=tf.float32),
+                                          tf.constant(beta[:,None],dtype=tf.float32)).numpy()[:,0])
+    return {"obs": obs, "A": np.stack(A, axis=1), "R": np.stack(R, axis=1),
+            "old_logp": np.stack(old_logp, axis=1), "V": np.stack(V, axis=1)}
+
+def _worker(conn, df, starts, horizon, cfg):
+    """rollout 워커 프로세스: 자기 env + 모델 사본. (가중치, 시드) 수신 -> 에피소드 1회 -> (궤적, 단계별 시간) 반환. None 이면 종료."""
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    env = make_env(df, starts, horizon, cfg["window"])
+    input_dim = env._state().shape[1]
+    actor, critic = make_models(input_dim, cfg["shared"])
+    policy = Policy(actor, critic)
+    win = ObservationWindow(cfg["window"], input_dim, batch=env.K)
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        actor.set_weights(msg[0])
+        if critic is not None: critic.set_weights(msg[1])
+        np.random.seed(msg[2])  # 학습 프로세스 RNG 에서 뽑은 시드 -> 체크포인트 재개 시 같은 행동 샘플
+        timer = PhaseTimer()
+        traj = rollout(env, win, policy, cfg["window"], timer)
+        conn.send((traj, timer.totals, timer.counts))
+    conn.close()
+
+class RolloutPool:
+    """N개 워커 프로세스(spawn)가 starts 를 나눠 rollout. 궤적/가중치는 파이프로 주고받는다."""
+    def __init__(self, n, df, starts, horizon, cfg):
+        if not 1 <= n <= len(starts):
+            raise ValueError(f"workers must be in [1, envs={len(starts)}], got {n}")
+        ctx = mp.get_context("spawn")
+        self.conns, self.procs = [], []
+        for chunk in np.array_split(np.asarray(starts), n):
+            src = df
+            if isinstance(df, tuple):
+                # 피처 배열(memmap) 은 통째로 pickle 되지 않게 워커 구간만 잘라 보낸다
+                lo = int(chunk.min())
+                src = tuple(np.asarray(a[lo:int(chunk.max()) + horizon + 1]) for a in df)
+                chunk = chunk - lo
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(child, src, chunk, horizon, cfg), daemon=True)
+            proc.start()
+            self.conns.append(parent); self.procs.append(proc)
+
+    def collect(self, actor, critic=None, timer=None):
+        """가중치 배포 -> 궤적 수집. timer 에 sync(가중치 전송) 와 워커 단계별 시간(워커 평균) 을 더한다."""
+        timer = timer or PhaseTimer()
+        with timer("sync"):
+            weights = (actor.get_weights(), critic.get_weights() if critic is not None else None)
+            seeds = np.random.randint(0, 2**31 - 1, size=len(self.conns))
+            for conn, seed in zip(self.conns, seeds):
+                conn.send((*weights, int(seed)))
+        results = [conn.recv() for conn in self.conns]
+        for _, totals, counts in results:
+            timer.merge(totals, counts, scale=1.0 / len(results))
+        trajs = [r[0] for r in results]
+        return {k: np.concatenate([tr[k] for tr in trajs]) for k in trajs[0]}
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(None)
+        for proc in self.procs:
+            proc.join()
 
 def main(args):
-    df = get_ohlcv(args.ticker, count=args.count)
-    env = DailyOHLCVEnv(df, fee=float(os.getenv("UPBIT_FEE","0.0005")), init_krw=1_000_000, window=args.window)
+    if args.seed is not None:
+        tf.keras.utils.set_random_seed(args.seed)  # python / np.random / TF (Keras 초기화 포함)
+    if args.interval == "day":
+        df = get_ohlcv(args.ticker, count=args.count)
+    else:
+        # 분봉 등: backfill 된 저장소에서 청크 계산 피처 memmap (pandas 프레임 없이), 최근 count 개 bar
+        feats, close = load_features(OHLCVStore(args.cache_dir), args.ticker, args.interval)
+        if len(close) == 0:
+            raise RuntimeError(f"No {args.interval} bars for {args.ticker} in {args.cache_dir} (run upbit_rl.data.backfill first)")
+        df = (feats[-args.count:], close[-args.count:])
+    # K개 에피소드를 시작 오프셋만 다르게 lockstep 진행 -> predict 1회로 K개 처리
+    starts = np.arange(args.envs) * args.stride
+    env = make_env(df, starts, args.horizon, args.window)
+    K, T = env.K, env.N - 1
 
-    input_dim = env._state().shape[0]
-    actor = make_actor_beta(input_dim)
-    critic = make_critic(input_dim)
+    input_dim = env._state().shape[1]
+    actor, critic = make_models(input_dim, args.shared)
     opt_a = tf.keras.optimizers.Adam(args.lr)
     opt_c = tf.keras.optimizers.Adam(args.lr)
+    policy = Policy(actor, critic)
+    update = make_update(actor, critic, opt_a, opt_c, clip_eps=0.2, vf_coef=args.vf_coef)
+    # 모델/옵티마이저/epoch/RNG 주기 저장, --resume 이면 최신 체크포인트에서 이어서
+    ckpt = Checkpointer(args.ckpt_dir, {"actor": actor, "critic": critic}, {"actor": opt_a, "critic": opt_c if critic is not None else None}, keep=args.keep)
+    start = ckpt.restore() if args.resume else 0
+    if args.workers > 0:
+        # --workers N: 프로세스별 env/모델 사본으로 rollout, 학습은 이 프로세스에서
+        pool = RolloutPool(args.workers, df, starts, T, {"window": args.window, "shared": args.shared})
+    else:
+        pool = None
+        win = ObservationWindow(args.window, input_dim, batch=K)
 
-    clip_eps = 0.2
-    for ep in range(args.epochs):
-        s = env.reset(); done=False
-        states=[s]; A=[]; R=[]; old_logp=[]; V=[]
+    timer = PhaseTimer()
+    logger = MetricsLogger(args.logdir, tensorboard=args.tensorboard, config=vars(args))
+    for ep in range(start, args.epochs):
+        timer.reset()
+        t_ep = time.perf_counter()
+        with trace(args.logdir, enabled=ep == args.profile_epoch):
+            with timer("rollout"):
+                traj = pool.collect(actor, critic, timer) if pool else rollout(env, win, policy, args.window, timer)
 
-        # rollout
-        while not done:
-            S = np.array([np.vstack(states)[-args.window:]])
-            ab = actor.predict(S, verbose=0)[0]
-            alpha = ab[0] + 1.0; beta = ab[1] + 1.0
-            a = np.random.beta(alpha, beta)
-            v = float(critic.predict(S, verbose=0)[0,0])
-            s2, r, done, info = env.step(a)
-            A.append([a]); R.append(r); V.append(v); states.append(s2)
-            # old_logp 저장
-            old_logp.append(beta_log_prob(tf.constant([[a]],dtype=tf.float32),
-                                          tf.constant([[alpha]],dtype=tf.float32),
-                                          tf.constant([[beta]],dtype=tf.float32)).numpy()[0,0])
-
-        # advantage
-        returns = discounted(R, gamma=args.gamma)
-        adv = returns - np.array(V, dtype=np.float32)
-        adv = (adv - adv.mean()) / (adv.std() + 1e-8)
-
-        S_all = np.array([np.vstack(states)[:-1]])  # 마지막 state 제외
-        # 여러 epoch로 미니배치 업데이트
-        for _ in range(args.update_epochs):
-            with tf.GradientTape() as ta, tf.GradientTape() as tc:
-                ab = actor(S_all, training=True)
-                alpha = ab[:,:,0:1] + 1.0
-                beta  = ab[:,:,1:2] + 1.0
-                A_tf = tf.constant(A, dtype=tf.float32)  # (T,1)
-                old_logp_tf = tf.constant(old_logp, dtype=tf.float32)[:,None]
-                logp = beta_log_prob(A_tf, alpha, beta)
-                ratio = tf.exp(logp - old_logp_tf)
-                adv_tf = tf.constant(adv, dtype=tf.float32)[:,None]
-                loss_a = -tf.reduce_mean(tf.minimum(ratio*adv_tf,
-                              tf.clip_by_value(ratio, 1.0-clip_eps, 1.0+clip_eps)*adv_tf))
-                v_pred = critic(S_all, training=True)[:, :, 0]
-                loss_c = tf.reduce_mean(tf.square(v_pred - tf.constant(returns, dtype=tf.float32)[None,:]))
-            opt_a.apply_gradients(zip(ta.gradient(loss_a, actor.trainable_weights), actor.trainable_weights))
-            opt_c.apply_gradients(zip(tc.gradient(loss_c, critic.trainable_weights), critic.trainable_weights))
+            windows = np.lib.stride_tricks.sliding_window_view(traj["obs"], args.window, axis=1).transpose(0, 1, 3, 2)  # (K, T, window, dim) view
+            gather = lambda idx: windows[idx // T, idx % T]  # flat(k*T+t) -> (B, window, dim)
+            A_flat = traj["A"].reshape(-1, 1).astype(np.float32)
+
+            # advantage (K, T): GAE(lambda), lam=1 이면 할인 수익 - V
+            with timer("advantage"):
+                R = traj["R"]
+                adv, returns = gae(R, traj["V"], gamma=args.gamma, lam=args.lam)
+                adv = (adv - adv.mean()) / (adv.std() + 1e-8)
+
+            # rollout 때 정책이 본 window 그대로 (truncated BPTT, 길이 window) 셔플 미니배치 학습
+            with timer("update"):
+                old_logp_flat = traj["old_logp"].reshape(-1, 1).astype(np.float32)
+                adv_flat = adv.reshape(-1, 1).astype(np.float32)
+                ret_flat = returns.reshape(-1).astype(np.float32)
+                for _ in range(args.update_epochs):
+                    for idx in minibatches(K*T, args.batch_size):
+                        loss_a, loss_c = update(gather(idx), A_flat[idx], old_logp_flat[idx], adv_flat[idx], ret_flat[idx])
+                loss_a, loss_c = float(loss_a), float(loss_c)  # 비동기 실행분까지 update 시간에 포함
+        if args.ckpt_every > 0 and ((ep + 1) % args.ckpt_every == 0 or ep == args.epochs - 1):
+            with timer("checkpoint"):
+                ckpt.save(ep)
+        if args.export_every > 0 and (ep + 1) % args.export_every == 0:
+            with timer("export"):
+                actor.save(os.path.join(args.ckpt_dir, f"actor_ep{ep:04d}.keras"))  # backtest --models 'models/ckpt/*.keras' 용 (정리 안 함)
+        t_ep = time.perf_counter() - t_ep  # 체크포인트/내보내기 포함
 
-        print(f"[EP {ep}] R_sum={np.sum(R):.5f} A_loss={float(loss_a):.5f} C_loss={float(loss_c):.5f}")
+        t_rollout, t_update = timer.totals["rollout"], timer.totals["update"]
+        metrics = {"return": R.sum(axis=1).mean(), "loss_a": loss_a, "loss_c": loss_c, "time/epoch": t_ep, **timer.flat(),
+                   "throughput/steps_per_s": T / t_rollout,           # lockstep env step (K 에피소드 동시)
+                   "throughput/samples_per_s": K * T / t_rollout,     # 수집 샘플
+                   "throughput/update_samples_per_s": args.update_epochs * K * T / t_update}
+        logger.log(ep, metrics)
+        print(f"[EP {ep}] R_sum={metrics['return']:.5f} A_loss={loss_a:.5f} C_loss={loss_c:.5f} "
+              f"rollout={t_rollout:.2f}s ({K*T/t_rollout:,.0f} samples/s) update={t_update:.2f}s "
+              f"({metrics['throughput/update_samples_per_s']:,.0f} samples/s) | {timer.summary()}")
 
+    logger.close()
+    if pool:
+        pool.close()
     os.makedirs("models", exist_ok=True)
-    actor.save("models/actor_latest.h5")
-    critic.save("models/critic_latest.h5")
+    if critic is None:
+        actor.save("models/actor_critic_latest.keras")
+    else:
+        actor.save("models/actor_latest.keras")
+        critic.save("models/critic_latest.keras")
     print("Saved models to models/")
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
     p.add_argument("--ticker", default=os.getenv("TICKER","KRW-BTC"))
     p.add_argument("--count", type=int, default=500)
+    p.add_argument("--interval", default="day", help="bar 간격 (day 외에는 저장소의 backfill 데이터 사용, 예: minute1)")
+    p.add_argument("--cache_dir", default="data/cache")
     p.add_argument("--window", type=int, default=30)
     p.add_argument("--epochs", type=int, default=8)
+    p.add_argument("--envs", type=int, default=1, help="lockstep 병렬 에피소드 수 K")
+    p.add_argument("--stride", type=int, default=20, help="에피소드 간 시작 오프셋 간격")
+    p.add_argument("--horizon", type=int, default=None, help="에피소드 길이 (기본: 가능한 최대)")
+    p.add_argument("--workers", type=int, default=0, help="rollout 워커 프로세스 수 (0: 학습 프로세스에서 직접)")
+    p.add_argument("--shared", action="store_true", help="actor/critic 공유 LSTM 트렁크 모델 사용")
+    p.add_argument("--vf_coef", type=float, default=0.5, help="--shared 에서 critic loss 가중치")
     p.add_argument("--update_epochs", type=int, default=5)
+    p.add_argument("--batch_size", type=int, default=256, help="PPO 미니배치 크기 (window 단위)")
     p.add_argument("--lr", type=float, default=1e-3)
     p.add_argument("--gamma", type=float, default=0.99)
+    p.add_argument("--lam", type=float, default=1.0, help="GAE lambda (1.0: 할인 수익 - V, 이전 동작)")
+    p.add_argument("--ckpt_dir", default="models/ckpt", help="체크포인트 디렉터리")
+    p.add_argument("--ckpt_every", type=int, default=1, help="N epoch 마다 체크포인트 (0: 끔)")
+    p.add_argument("--keep", type=int, default=3, help="남길 재개용 체크포인트 수")
+    p.add_argument("--resume", action="store_true", help="--ckpt_dir 최신 체크포인트에서 이어서 학습")
+    p.add_argument("--export_every", type=int, default=0, help="N epoch 마다 --ckpt_dir/actor_epNNNN.keras 내보내기 (backtest 체크포인트 비교용, 0: 끔)")
+    p.add_argument("--seed", type=int, default=None, help="np.random / TF 시드")
+    p.add_argument("--logdir", default="", help="epoch 지표 JSONL(metrics.jsonl) 기록 디렉터리 (비우면 기록 안 함)")
+    p.add_argument("--tensorboard", action="store_true", help="--logdir 에 TensorBoard 스칼라도 기록")
+    p.add_argument("--profile_epoch", type=int, default=-1, help="이 epoch 의 tf.profiler trace 를 --logdir 에 캡처")
     args = p.parse_args()
     main(args)